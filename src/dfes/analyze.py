@@ -1,44 +1,42 @@
-import datetime
-from collections.abc import Iterable
+import bisect
+import json
+import time
+import tracemalloc
+from collections.abc import Collection, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from functools import cached_property
+from pathlib import Path
 
 import polars as pl
 import polars.selectors as cs
 
-from dfes.bans import parse_bans
-from dfes.feeds import parse_feed
-from dfes.model import Feed
-from dfes.repository import FileRepository, FeedByPublished
+from dfes.cache import repository_cache, version_directory
+from dfes.columns import ColumnStore, column_store, record_batches, schema
+from dfes.feeds import parse_feeds_parallel
+from dfes.model import Feed, LOCATIONS, to_mask
+from dfes.repository import FileRepository, FeedByPublished, Repository, repository_location
+from dfes.tables import ImportStats, LazyTables, LocationFilter, Tables, TABLE_NAMES, as_perth, from_columns, \
+    to_tables
 
 
 def to_dataframe(feeds: Iterable[Feed]) -> pl.DataFrame:
-    data = {
-        "feed_published": [],
-        "entry_index": [],
-        "entry_published": [],
-        "revoked": [],
-        "issued": [],
-        "declared_for": [],
-        "region": [],
-        "district": [],
-    }
-
-    for feed in feeds:
-        for index, item in enumerate(feed.items):
-            if not item.bans:
-                item.bans = parse_bans(item.description)
-
-            for location in item.bans.locations.pairs:
-                data["feed_published"].append(feed.published)
-                data["entry_index"].append(index)
-                data["entry_published"].append(item.published)
-                data["revoked"].append(item.bans.revoked)
-                data["issued"].append(item.bans.issued.astimezone(datetime.timezone.utc))
-                data["declared_for"].append(item.bans.declared_for)
-                data["region"].append(location[0])
-                data["district"].append(location[1])
-
-    df = pl.DataFrame(data)
+    frames = [arrow_frame(batch) for batch in record_batches(feeds)]
 
+    if not frames:
+        return in_perth(arrow_frame(schema().empty_table()))
+
+    return in_perth(pl.concat(frames, rechunk=False))
+
+
+def arrow_frame(data) -> pl.DataFrame:
+    if isinstance(df := pl.from_arrow(data, rechunk=False), pl.DataFrame):
+        return df
+    raise TypeError(f"Expected columns, got {type(df).__name__}")
+
+
+def in_perth(df: pl.DataFrame) -> pl.DataFrame:
     return df.select(
         perth_tz("feed_published"),
         pl.col("entry_index"),
@@ -47,15 +45,120 @@ def to_dataframe(feeds: Iterable[Feed]) -> pl.DataFrame:
         perth_tz("issued"),
         pl.col("declared_for"),
         pl.col("region"),
-        pl.col("district")
+        pl.col("district"),
+        pl.col("location_code"),
     )
 
 
-def import_file_repository() -> pl.DataFrame:
-    repo = FileRepository()
-    feeds = [parse_feed(feed_text) for feed_text in FeedByPublished(repo)]
-    df = to_dataframe(feeds)
-    return df
+def locations_mask(codes: pl.Series) -> int:
+    return to_mask(codes.unique().to_list())
+
+
+def import_column_store(store: ColumnStore) -> pl.DataFrame:
+    return in_perth(read_column_store(store))
+
+
+def read_column_store(store: ColumnStore) -> pl.DataFrame:
+    df = pl.read_parquet(store.files(), hive_partitioning=False)
+    return df.sort("feed_published", "entry_index", maintain_order=True)
+
+
+def import_repository(repository_directory: Path | None = None) -> pl.DataFrame:
+    repository = FileRepository(repository_directory or repository_location())
+    store = column_store(repository.location)
+
+    if store and store.covers(repository.published()) and store.files():
+        return import_column_store(store)
+
+    return import_file_repository(repository)
+
+
+def import_file_repository(repository: Repository | None = None) -> pl.DataFrame:
+    return to_dataframe(parsed_feeds(FeedByPublished(repository or FileRepository())))
+
+
+def import_tables(repository_directory: Path | None = None) -> Tables:
+    repository = FileRepository(repository_directory or repository_location())
+    LOCATIONS.use_file(repository.location / "locations.tsv")
+    return import_incrementally(repository, contexts_directory(repository.location), column_store(repository.location))
+
+
+def scan_tables(repository_directory: Path | None = None) -> LazyTables:
+    repository = FileRepository(repository_directory or repository_location())
+    LOCATIONS.use_file(repository.location / "locations.tsv")
+    directory = contexts_directory(repository.location)
+    update_tables(repository, directory, column_store(repository.location))
+    return LazyTables.scan(directory)
+
+
+def contexts_directory(repository_directory: Path) -> Path:
+    return version_directory(repository_directory) / "contexts"
+
+
+def import_incrementally(repository: Repository, directory: Path, store: ColumnStore | None = None) -> Tables:
+    update_tables(repository, directory, store)
+    return Tables.read(directory)
+
+
+def update_tables(repository: Repository, directory: Path, store: ColumnStore | None = None) -> None:
+    published = repository.published()
+    mark = read_watermark(directory)
+
+    if mark and Tables.stored(directory) and bisect.bisect_right(published, mark.published) == mark.n_published:
+        if mark.n_published == len(published):
+            return
+        newer = to_tables(parsed_feeds(FeedByPublished(repository)[mark.n_published:]))
+        newer.without_entries(Tables.stored_keys(directory)).write(directory, part=mark.n_published)
+    else:
+        if store and store.covers(published) and store.files():
+            tables = from_columns(read_column_store(store), published)
+        else:
+            tables = to_tables(parsed_feeds(FeedByPublished(repository)))
+        Tables.remove(directory)
+        tables.write(directory, part=0)
+
+    if published:
+        write_watermark(directory, Watermark(published=published[-1], n_published=len(published)))
+
+
+@dataclass(frozen=True)
+class Watermark:
+    published: datetime
+    n_published: int
+
+
+def read_watermark(directory: Path) -> Watermark | None:
+    try:
+        state = json.loads((directory / "watermark.json").read_text())
+        return Watermark(datetime.fromisoformat(state["published"]), state["n_published"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def write_watermark(directory: Path, mark: Watermark) -> None:
+    state = {"published": mark.published.isoformat(), "n_published": mark.n_published}
+    (directory / "watermark.json").write_text(json.dumps(state))
+
+
+@contextmanager
+def measured(stats: ImportStats, trace_memory: bool = False) -> Iterator[ImportStats]:
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+
+    try:
+        yield stats
+    finally:
+        stats.seconds = time.perf_counter() - started
+        if trace_memory:
+            stats.peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+
+def parsed_feeds(feeds: FeedByPublished) -> Iterator[Feed]:
+    for feed in parse_feeds_parallel(feeds.prefetch(), cache=repository_cache(feeds.repository)):
+        if isinstance(feed, Feed):
+            yield feed
 
 
 def col_interval_minutes(first: str, second: str) -> pl.Expr:
@@ -85,51 +188,81 @@ def perth_tz(dt_col: str) -> pl.Expr:
 
 
 class Contexts:
-    def __init__(self):
-        self._df = import_file_repository()
+    def __init__(self, tables: Tables | LazyTables | None = None,
+                 start: datetime | None = None,
+                 end: datetime | None = None,
+                 regions: Collection[str] | None = None,
+                 districts: Collection[str] | None = None):
+        if tables is None:
+            tables = scan_tables()
+        if isinstance(tables, Tables):
+            tables = tables.lazy()
+        self._tables = tables.filtered(start, end, regions, districts)
+        self.stats: ImportStats | None = None
+
+    @classmethod
+    def from_repository(cls, repository: Repository,
+                        start: datetime | None = None,
+                        end: datetime | None = None,
+                        regions: Collection[str] | None = None,
+                        districts: Collection[str] | None = None,
+                        trace_memory: bool = False) -> "Contexts":
+        stats = ImportStats()
+        keep = LocationFilter(regions, districts) if regions or districts else None
+        feeds = FeedByPublished(repository, start and as_perth(start), end and as_perth(end))
+
+        with measured(stats, trace_memory):
+            tables = to_tables(parsed_feeds(feeds), keep, stats)
+
+        stats.table_bytes = sum(getattr(tables, name).estimated_size() for name in TABLE_NAMES)
+        contexts = cls(tables, start, end, regions, districts)
+        contexts.stats = stats
+        return contexts
+
+    @cached_property
+    def _entry_level(self) -> pl.DataFrame:
+        return self._tables.entry_level().collect()
 
     def base(self) -> pl.DataFrame:
-        return self._df
+        return self._tables.wide().collect()
 
     def no_locations(self) -> pl.DataFrame:
-        return self._df.select(pl.exclude("region", "district")).unique()
+        return self._entry_level
 
     def display(self) -> pl.DataFrame:
-        return self.no_locations().with_columns(
+        return self.no_locations().lazy().with_columns(
             n_entries()
         ).filter(
             pl.col("n_entries") > 1
-        ).unique().sort(
+        ).sort(
             pl.col("feed_published", "entry_index")
-        ).select(format_datetime(), ~cs.datetime())
+        ).select(format_datetime(), ~cs.datetime()).collect()
 
     def max_delay(self) -> pl.DataFrame:
-        return self._df.select(
-            cs.datetime(), cs.date()
-        ).unique().select(
+        return self._tables.entries.select(
             (pl.col("declared_for") - pl.col("issued").cast(pl.Date).alias("dfes_declared_for"))
-        ).max()
+        ).max().collect()
 
     def publish_delay(self) -> pl.DataFrame:
-        return self._df.select(cs.datetime(), cs.date()).unique().select(
+        return self._tables.entry_level().select(
             (pl.col("feed_published") - pl.col("entry_published")).alias("entry_pub_to_feed_pub"),
-        ).max()
+        ).max().collect()
 
     def dates(self) -> pl.DataFrame:
-        return self._df.select(
+        return self.no_locations().select(
             cs.datetime().dt.date(),
             pl.col("declared_for")
         )
 
     def times(self) -> pl.DataFrame:
-        return self._df.select(
+        return self.no_locations().select(
             cs.datetime().dt.time(),
         )
 
     def feeds_and_entries(self) -> pl.DataFrame:
-        return self._df.select(
+        return self._tables.entry_level().select(
             "feed_published", "entry_published", "entry_index", n_entries()
-        ).unique()
+        ).collect()
 
 
 def main():
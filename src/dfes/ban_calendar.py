@@ -0,0 +1,188 @@
+import json
+import mmap
+import os
+from array import array
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+from dfes.cache import version_directory
+from dfes.date_time import since_epoch
+from dfes.memo import cached_parse_bans
+from dfes.model import Feed, TotalFireBans
+
+NONE, DECLARED, REVOKED = 0, 1, 2
+DEFAULT_WIDTH = 256
+
+
+@dataclass(frozen=True)
+class Shape:
+    first_day: int
+    n_days: int
+    width: int
+
+    def index(self, day: date, code: int) -> int:
+        return (day.toordinal() - self.first_day) * self.width + code
+
+    def covers(self, day: date, code: int) -> bool:
+        return self.first_day <= day.toordinal() < self.first_day + self.n_days and code < self.width
+
+    def including(self, day: date, code: int) -> "Shape":
+        if self.n_days == 0:
+            return Shape(day.toordinal(), 1, max(self.width, grown_width(code)))
+
+        first_day = min(self.first_day, day.toordinal())
+        last_day = max(self.first_day + self.n_days, day.toordinal() + 1)
+        width = self.width if code < self.width else grown_width(code)
+        return Shape(first_day, last_day - first_day, width)
+
+
+def grown_width(code: int) -> int:
+    width = DEFAULT_WIDTH
+    while width <= code:
+        width *= 2
+    return width
+
+
+def issued_minutes(bans: TotalFireBans) -> int:
+    return since_epoch(bans.issued, timedelta(minutes=1))
+
+
+class BanCalendar:
+    def __init__(self, directory: Path):
+        self._directory = directory
+        self._header = directory / "calendar.json"
+        self._states = directory / "states.u8"
+        self._issued = directory / "issued.u32"
+
+    def exists(self) -> bool:
+        return self._header.exists()
+
+    def shape(self) -> Shape:
+        try:
+            return Shape(**json.loads(self._header.read_text()))
+        except (OSError, ValueError, TypeError):
+            return Shape(0, 0, DEFAULT_WIDTH)
+
+    def update(self, feeds: Iterable[Feed]) -> int:
+        shape = self.shape()
+        states = bytearray(self._states.read_bytes()) if self.exists() else bytearray()
+        issued = array("I", self._issued.read_bytes() if self.exists() else b"")
+        in_order = list(ordered_bans(feeds))
+
+        if (needed := covering(shape, in_order)) != shape:
+            states, issued, shape = reshaped(states, issued, shape, needed)
+
+        for bans in in_order:
+            minutes = issued_minutes(bans)
+            state = REVOKED if bans.revoked else DECLARED
+            for code in bans.locations.codes:
+                index = shape.index(bans.declared_for, code)
+                if issued[index] <= minutes:
+                    states[index], issued[index] = state, minutes
+
+        self._write(states, issued, shape)
+        return len(in_order)
+
+    def rebuild(self, feeds: Iterable[Feed]) -> int:
+        for path in (self._header, self._states, self._issued):
+            path.unlink(missing_ok=True)
+        return self.update(feeds)
+
+    def days(self) -> list[date]:
+        shape = self.shape()
+        return [date.fromordinal(shape.first_day + offset) for offset in range(shape.n_days)]
+
+    def column(self, code: int, start: date | None = None, end: date | None = None) -> bytes:
+        shape = self.shape()
+        if shape.n_days == 0 or code >= shape.width:
+            return b""
+
+        first, last = day_range(shape, start, end)
+        with self._mapped() as states:
+            return states[first * shape.width + code:last * shape.width:shape.width]
+
+    def row(self, day: date) -> bytes:
+        shape = self.shape()
+        if not shape.covers(day, 0):
+            return b""
+
+        with self._mapped() as states:
+            start = shape.index(day, 0)
+            return states[start:start + shape.width]
+
+    def count(self, code: int, state: int = DECLARED, start: date | None = None, end: date | None = None) -> int:
+        return self.column(code, start, end).count(state)
+
+    def dates(self, code: int, state: int = DECLARED, start: date | None = None, end: date | None = None) -> list[date]:
+        shape = self.shape()
+        first = day_range(shape, start, end)[0]
+        return [
+            date.fromordinal(shape.first_day + first + offset)
+            for offset in positions(self.column(code, start, end), state)
+        ]
+
+    def codes(self, day: date, state: int = DECLARED) -> list[int]:
+        return list(positions(self.row(day), state))
+
+    def _mapped(self) -> mmap.mmap:
+        with self._states.open("rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _write(self, states: bytearray, issued: array, shape: Shape) -> None:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        for path, data in ((self._states, states), (self._issued, issued.tobytes())):
+            temporary = path.with_suffix(f".{os.getpid()}.tmp")
+            temporary.write_bytes(data)
+            temporary.replace(path)
+        self._header.write_text(json.dumps(asdict(shape)))
+
+    @property
+    def location(self) -> Path:
+        return self._directory
+
+
+def ordered_bans(feeds: Iterable[Feed]) -> Iterator[TotalFireBans]:
+    for feed in feeds:
+        feed_bans = (item.bans or cached_parse_bans(item.description) for item in feed.items)
+        yield from sorted(feed_bans, key=lambda bans: bans.issued)
+
+
+def covering(shape: Shape, in_order: Iterable[TotalFireBans]) -> Shape:
+    for bans in in_order:
+        for code in bans.locations.codes:
+            if not shape.covers(bans.declared_for, code):
+                shape = shape.including(bans.declared_for, code)
+    return shape
+
+
+def reshaped(states: bytearray, issued: array, old: Shape, new: Shape) -> tuple[bytearray, array, Shape]:
+    new_states = bytearray(new.n_days * new.width)
+    new_issued = array("I", bytes(4 * new.n_days * new.width))
+
+    for offset in range(old.n_days):
+        source = offset * old.width
+        target = (old.first_day + offset - new.first_day) * new.width
+        new_states[target:target + old.width] = states[source:source + old.width]
+        new_issued[target:target + old.width] = issued[source:source + old.width]
+
+    return new_states, new_issued, new
+
+
+def day_range(shape: Shape, start: date | None, end: date | None) -> tuple[int, int]:
+    first = max(start.toordinal() - shape.first_day, 0) if start else 0
+    last = min(end.toordinal() - shape.first_day + 1, shape.n_days) if end else shape.n_days
+    return first, max(first, last)
+
+
+def positions(states: bytes, state: int) -> Iterator[int]:
+    marker = bytes([state])
+    index = states.find(marker)
+    while index != -1:
+        yield index
+        index = states.find(marker, index + 1)
+
+
+def ban_calendar(repository_directory: Path) -> BanCalendar:
+    return BanCalendar(version_directory(repository_directory) / "calendar")
@@ -1,16 +1,22 @@
 import re
-from collections.abc import Iterator
+from collections import Counter
+from collections.abc import Iterator, Callable
 from datetime import date, time, datetime
 from zoneinfo import ZoneInfo
 
 from bs4 import BeautifulSoup, Tag
 
+from dfes import extract
 from dfes.date_time import extract_date, extract_time
 from dfes.exceptions import ParsingFailed
 from dfes.model import AffectedAreas, TotalFireBans
 
 
-def parse_bans(description_html: str) -> TotalFireBans:
+def parse_bans(description_html: str, backend: str | None = None) -> TotalFireBans:
+    return BACKENDS[backend or DEFAULT_BACKEND](description_html)
+
+
+def parse_bans_soup(description_html: str) -> TotalFireBans:
     soup = BeautifulSoup(description_html, features="html.parser")
 
     issued = datetime.combine(
@@ -117,3 +123,30 @@ def region_locations(region_tag: Tag) -> Iterator[tuple[str, str]]:
 def locations(soup: BeautifulSoup) -> Iterator[tuple[str, str]]:
     for region_tag in get_region_tags(soup):
         yield from region_locations(region_tag)
+
+
+BACKENDS: dict[str, Callable[[str], TotalFireBans]] = {
+    "html.parser": parse_bans_soup,
+}
+
+try:
+    from dfes import bans_lxml
+    BACKENDS["lxml"] = bans_lxml.parse_bans
+    FALLBACK_BACKEND = "lxml"
+except ImportError:
+    FALLBACK_BACKEND = "html.parser"
+
+EXTRACTOR_COUNTS: Counter[str] = Counter()
+
+
+def parse_bans_template(description_html: str) -> TotalFireBans:
+    if bans := extract.extract(description_html):
+        EXTRACTOR_COUNTS["extracted"] += 1
+        return bans
+
+    EXTRACTOR_COUNTS["fallback"] += 1
+    return BACKENDS[FALLBACK_BACKEND](description_html)
+
+
+BACKENDS["template"] = parse_bans_template
+DEFAULT_BACKEND = "template"
@@ -0,0 +1,95 @@
+from collections.abc import Iterator
+from datetime import date, time, datetime
+from zoneinfo import ZoneInfo
+
+import lxml.html
+from lxml import etree
+
+from dfes.date_time import extract_date, extract_time
+from dfes.exceptions import ParsingFailed
+from dfes.model import AffectedAreas, TotalFireBans
+
+TIME_OF_ISSUE = etree.XPath("//span[not(*) and contains(., 'Time of issue:')]")
+DATE_OF_ISSUE = etree.XPath("//span[not(*) and contains(., 'Date of issue:')]")
+DECLARED = etree.XPath("//p[not(*) and contains(., 'A Total Fire Ban has been declared')]")
+REVOKED = etree.XPath("//p[not(*) and contains(., 'has been revoked')]")
+REGIONS = etree.XPath("//strong[not(*) and contains(., 'Region:')]")
+DISTRICTS = etree.XPath("following::ul[1]//li")
+
+
+def parse_bans(description_html: str) -> TotalFireBans:
+    root = to_tree(description_html)
+
+    issued = datetime.combine(
+        date_of_issue(root),
+        time_of_issue(root),
+        ZoneInfo(key='Australia/Perth')
+    )
+
+    if revoked := bans_are_revoked(root):
+        declared = extract_date(tag_contents(REVOKED(root), "p"))
+    else:
+        declared = extract_date(tag_contents(DECLARED(root), "p"))
+
+    areas = AffectedAreas(list(locations(root)))
+
+    return TotalFireBans(
+        revoked=revoked,
+        issued=issued,
+        declared_for=declared,
+        locations=areas,
+    )
+
+
+def to_tree(description_html: str) -> etree.ElementBase:
+    try:
+        return lxml.html.fromstring(description_html)
+    except (etree.ParserError, ValueError):
+        raise ParsingFailed("Description is not HTML")
+
+
+def tag_contents(found: list, tag_name: str) -> str:
+    if not found:
+        raise ParsingFailed(f"No <{tag_name}> tag found")
+
+    if not (contents := found[0].text):
+        raise ParsingFailed(f"Tag <{tag_name}> has no contents")
+
+    return contents.strip()
+
+
+def time_of_issue(root: etree.ElementBase) -> time:
+    return extract_time(tag_contents(TIME_OF_ISSUE(root), "span"))
+
+
+def date_of_issue(root: etree.ElementBase) -> date:
+    return extract_date(tag_contents(DATE_OF_ISSUE(root), "span"))
+
+
+def bans_are_revoked(root: etree.ElementBase) -> bool:
+    if DECLARED(root):
+        return False
+
+    if REVOKED(root):
+        return True
+
+    raise ParsingFailed(f"Neither declared for nor revoked tag found")
+
+
+def extract_district(tag: etree.ElementBase) -> str:
+    if len(tag) == 0 and (contents := tag.text):
+        return contents.removesuffix(" - All Day")
+    raise ParsingFailed("Could not extract district")
+
+
+def extract_region(tag: etree.ElementBase) -> str:
+    if contents := tag.text:
+        return contents.removesuffix(" Region:")
+    raise ParsingFailed("Could not extract region")
+
+
+def locations(root: etree.ElementBase) -> Iterator[tuple[str, str]]:
+    for region_tag in REGIONS(root):
+        region = extract_region(region_tag)
+        for district_tag in DISTRICTS(region_tag):
+            yield region, extract_district(district_tag)
@@ -0,0 +1,65 @@
+import hashlib
+import os
+import pickle
+import shutil
+from pathlib import Path
+
+from dfes.model import Feed
+
+# Bump whenever parsing produces different Feed, Item or TotalFireBans values.
+PARSER_VERSION = 2
+
+
+def content_hash(feed_text: str) -> str:
+    return hashlib.sha256(feed_text.encode()).hexdigest()
+
+
+def cache_directory(repository_directory: Path) -> Path:
+    return repository_directory / "cache"
+
+
+def version_directory(repository_directory: Path) -> Path:
+    return cache_directory(repository_directory) / f"parser_v{PARSER_VERSION}"
+
+
+def remove_stale_versions(repository_directory: Path) -> None:
+    current = version_directory(repository_directory)
+    for child in cache_directory(repository_directory).iterdir():
+        if child.is_dir() and child != current:
+            shutil.rmtree(child)
+
+
+class FeedCache:
+    def __init__(self, location: Path):
+        self._location = location
+        self._location.mkdir(parents=True, exist_ok=True)
+
+    def get(self, feed_text: str) -> Feed | None:
+        try:
+            return pickle.loads(self._path(feed_text).read_bytes())
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def put(self, feed_text: str, feed: Feed) -> None:
+        path = self._path(feed_text)
+        temporary = path.with_suffix(f".{os.getpid()}.tmp")
+        temporary.write_bytes(pickle.dumps(feed))
+        temporary.replace(path)
+
+    def _path(self, feed_text: str) -> Path:
+        return self._location / f"{content_hash(feed_text)}.pickle"
+
+    @property
+    def location(self) -> Path:
+        return self._location
+
+
+def feed_cache(repository_directory: Path) -> FeedCache:
+    cache = FeedCache(version_directory(repository_directory))
+    remove_stale_versions(repository_directory)
+    return cache
+
+
+def repository_cache(repository: object) -> FeedCache | None:
+    location = getattr(repository, "location", None)
+    return feed_cache(location) if location else None
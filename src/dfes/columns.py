@@ -0,0 +1,178 @@
+import os
+import shutil
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from itertools import chain, groupby, islice, repeat
+from pathlib import Path
+
+from dfes.cache import PARSER_VERSION
+from dfes.date_time import epoch_microseconds
+from dfes.memo import cached_parse_bans
+from dfes.model import Feed, LOCATIONS, entry_key
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+BATCH_FEEDS = 256
+STORE_FORMAT = 2
+
+
+def schema() -> "pa.Schema":
+    utc = pa.timestamp("us", tz="UTC")
+    return pa.schema([
+        ("feed_published", utc),
+        ("entry_index", pa.int64()),
+        ("entry_key", pa.uint64()),
+        ("entry_published", utc),
+        ("revoked", pa.bool_()),
+        ("issued", utc),
+        ("declared_for", pa.date32()),
+        ("region", pa.dictionary(pa.int32(), pa.string())),
+        ("district", pa.dictionary(pa.int32(), pa.string())),
+        ("location_code", pa.uint16()),
+    ])
+
+
+def record_batches(feeds: Iterable[Feed], batch_feeds: int = BATCH_FEEDS) -> Iterator["pa.RecordBatch"]:
+    feeds = iter(feeds)
+    while batch := list(islice(feeds, batch_feeds)):
+        yield to_record_batch(batch)
+
+
+def to_record_batch(feeds: list[Feed]) -> "pa.RecordBatch":
+    entries: dict[str, list] = {name: [] for name in ("feed_published", "entry_index", "entry_key", "entry_published",
+                                     "revoked", "issued", "declared_for")}
+    codes: list[int] = []
+    repeats: list[int] = []
+
+    for feed in feeds:
+        feed_published = epoch_microseconds(feed.published)
+        for index, item in enumerate(feed.items):
+            bans = item.bans or cached_parse_bans(item.description)
+            entries["feed_published"].append(feed_published)
+            entries["entry_index"].append(index)
+            entries["entry_key"].append(entry_key(item))
+            entries["entry_published"].append(epoch_microseconds(item.published))
+            entries["revoked"].append(bans.revoked)
+            entries["issued"].append(epoch_microseconds(bans.issued))
+            entries["declared_for"].append(bans.declared_for)
+            codes.extend(bans.locations.codes)
+            repeats.append(len(bans.locations.codes))
+
+    rows = pa.array(chain.from_iterable(map(repeat, range(len(repeats)), repeats)), pa.int32())
+    location_codes = pa.array(codes, pa.uint16())
+    regions, districts = catalogue_columns()
+    fields = schema()
+
+    columns = [pa.array(entries[name], fields.field(name).type).take(rows) for name in entries]
+    columns += [regions.take(location_codes).dictionary_encode(), districts.take(location_codes).dictionary_encode(),
+                location_codes]
+
+    return pa.RecordBatch.from_arrays(columns, schema=fields)
+
+
+def catalogue_columns() -> tuple["pa.Array", "pa.Array"]:
+    pairs = LOCATIONS.pairs()
+    return pa.array([region for region, _ in pairs]), pa.array([district for _, district in pairs])
+
+
+def to_table(feeds: Iterable[Feed]) -> "pa.Table":
+    return pa.Table.from_batches(record_batches(feeds), schema=schema())
+
+
+def to_partition_name(feed: Feed) -> str:
+    return feed.published.strftime("month=%Y-%m")
+
+
+def to_part_name(feed: Feed) -> str:
+    return feed.published.strftime("feed_%Y%m%d%H%M%S.parquet")
+
+
+class ColumnStore:
+    def __init__(self, location: Path):
+        self._location = location
+
+    def append(self, feed: Feed) -> None:
+        if not self.current():
+            self._start()
+
+        partition = self._location / to_partition_name(feed)
+        partition.mkdir(parents=True, exist_ok=True)
+        part = partition / to_part_name(feed)
+        replaced = part.exists()
+        write_table(to_table([feed]), part)
+
+        if not replaced:
+            (self._location / "FEEDS").write_text(str(self.n_feeds() + 1))
+
+    def rebuild(self, feeds: Iterable[Feed]) -> int:
+        staging = self._location.with_name(f"{self._location.name}.{os.getpid()}.tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+
+        written: Counter[str] = Counter()
+        for partition, month in groupby(tally(feeds, written), key=to_partition_name):
+            (staging / partition).mkdir(exist_ok=True)
+            with pq.ParquetWriter(staging / partition / f"rebuilt_{written['feeds']}.parquet", schema()) as writer:
+                for batch in record_batches(month):
+                    writer.write_batch(batch)
+
+        (staging / "VERSION").write_text(store_version())
+        (staging / "FEEDS").write_text(str(written["feeds"]))
+        shutil.rmtree(self._location, ignore_errors=True)
+        staging.rename(self._location)
+
+        return written["feeds"]
+
+    def _start(self) -> None:
+        shutil.rmtree(self._location, ignore_errors=True)
+        self._location.mkdir(parents=True)
+        (self._location / "VERSION").write_text(store_version())
+
+    def current(self) -> bool:
+        try:
+            return (self._location / "VERSION").read_text() == store_version()
+        except OSError:
+            return False
+
+    def n_feeds(self) -> int:
+        try:
+            return int((self._location / "FEEDS").read_text())
+        except (OSError, ValueError):
+            return 0
+
+    def covers(self, published: list[datetime]) -> bool:
+        return self.current() and self.n_feeds() == len(published)
+
+    def files(self) -> list[Path]:
+        return sorted(self._location.glob("month=*/*.parquet"))
+
+    @property
+    def location(self) -> Path:
+        return self._location
+
+
+def store_version() -> str:
+    return f"{PARSER_VERSION}.{STORE_FORMAT}"
+
+
+def tally(feeds: Iterable[Feed], counter: Counter) -> Iterator[Feed]:
+    for feed in feeds:
+        counter["feeds"] += 1
+        yield feed
+
+
+def write_table(table: "pa.Table", path: Path) -> None:
+    temporary = path.with_suffix(f".{os.getpid()}.tmp")
+    pq.write_table(table, temporary)
+    temporary.replace(path)
+
+
+def column_store(repository_directory: Path) -> ColumnStore | None:
+    if pa is None:
+        return None
+    return ColumnStore(repository_directory / "columns")
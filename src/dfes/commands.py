@@ -1,60 +1,186 @@
+from datetime import datetime
+
 import click
 
+from dfes.ban_calendar import REVOKED, ban_calendar
+from dfes.cache import feed_cache, version_directory
+from dfes.columns import column_store
+from dfes.date_time import to_perth_time
 from dfes.fetch import aquire_ban_feed, store_feed
-from dfes.migrate import do_migration
+from dfes.memo import BANS_CACHE, DiskTier
+from dfes.migrate import do_migration, migrate_to_content, rebuild_calendar, rebuild_column_store
+from dfes.model import LOCATIONS
 from dfes.reports import display_bans, display_feeds
-from dfes.repository import FileRepository, repository_location
+from dfes.repository import FileRepository, repository_location, open_repository, BACKENDS, SqliteRepository
 from dfes.show import to_show
+from dfes.snapshot import bans_snapshot
+from dfes.timeline import bans_at, bans_timeline
 
 
 @click.group()
-def dfes():
-    pass
+@click.option("--backend", type=click.Choice(BACKENDS), default="file", help="Repository storage backend")
+@click.pass_context
+def dfes(ctx, backend):
+    ctx.obj = open_repository(backend)
+    BANS_CACHE.use_disk(DiskTier(version_directory(ctx.obj.location) / "bans.sqlite3"))
+    LOCATIONS.use_file(ctx.obj.location / "locations.tsv")
 
 
 @dfes.command(help="Retrieve and store the feed")
-def fetch():
-    repository = FileRepository(repository_location())
+@click.pass_obj
+def fetch(repository):
     feed = aquire_ban_feed()
-    store_feed(feed, repository)
+    store_feed(feed, repository, cache=feed_cache(repository.location), columns=column_store(repository.location),
+               calendar=ban_calendar(repository.location), snapshot=bans_snapshot(repository.location),
+               timeline=bans_timeline(repository.location))
 
 
 @dfes.command(help="Show most recently issued bans")
-def show():
-    repository = FileRepository(repository_location())
-    bans = to_show(repository)
-
-    if not bans:
-        click.echo("Feed repository is empty. Run \"dfes fetch\"")
+@click.option("--at", "at", type=click.DateTime(), help="Show the bans in force at this time instead")
+@click.pass_obj
+def show(repository, at):
+    if at:
+        bans = bans_at(repository, bans_timeline(repository.location), to_perth_time(at))
+        if not bans:
+            click.echo(f"No bans found in feeds stored before {at:%c}.")
+    else:
+        bans = to_show(repository, feed_cache(repository.location), bans_snapshot(repository.location))
+        if not bans:
+            click.echo("Feed repository is empty. Run \"dfes fetch\"")
 
     display_bans(bans)
 
 
 @dfes.command(name="list", help="List the published date of stored feeds.")
-def list_():
-    repository = FileRepository(repository_location())
+@click.pass_obj
+def list_(repository):
     for pub_date in repository.published():
         click.echo(pub_date.strftime("%c"))
 
 
 @dfes.command(name="count", help="Count the number of feeds stored")
-def count():
-    repository = FileRepository(repository_location())
+@click.pass_obj
+def count(repository):
     n = len(repository.published())
     click.echo(f"Repository contains {n} feeds.")
 
 
 @dfes.command(name="migrate", help="Migrate repository to new schema")
-def migrate():
-    repository = FileRepository(repository_location())
+@click.option("--to", "to", type=click.Choice(["content"]), help="Copy feeds into another storage layout")
+@click.option("--remove-files", is_flag=True, help="Delete feed files once copied")
+@click.pass_obj
+def migrate(repository, to, remove_files):
+    if not isinstance(repository, FileRepository):
+        raise click.UsageError("Only the file backend can be migrated")
+
     do_migration(repository)
 
+    if to == "content":
+        n = migrate_to_content(repository, remove_files)
+        click.echo(f"Migrated {n} feeds to content storage.")
+
+
+@dfes.command(name="compact", help="Pack feeds published before a date into monthly segment files")
+@click.option("--before", "-b", type=click.DateTime(), help="Defaults to the start of the current month")
+@click.pass_obj
+def compact(repository, before):
+    if not isinstance(repository, FileRepository):
+        raise click.UsageError("Only the file backend can be compacted")
+
+    if not before:
+        before = to_perth_time(datetime.now()).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    n = repository.compact(to_perth_time(before))
+    click.echo(f"Packed {n} feeds.")
+
+
+@dfes.command(name="import-files", help="Import feeds stored as files into the sqlite backend")
+@click.pass_obj
+def import_files(repository):
+    if not isinstance(repository, SqliteRepository):
+        raise click.UsageError("Run as \"dfes --backend sqlite import-files\"")
+
+    n = repository.import_from(FileRepository(repository_location()))
+    click.echo(f"Imported {n} feeds.")
+
+
+@dfes.command(name="rebuild-columns", help="Regenerate the parsed bans column store from stored feeds. Fetch starts the store itself, but it only covers feeds stored before then once rebuilt")
+@click.option("--workers", "-w", type=int, help="Parse feeds in this many processes")
+@click.pass_obj
+def rebuild_columns(repository, workers):
+    if not (store := column_store(repository.location)):
+        raise click.UsageError("The column store needs pyarrow installed")
+
+    n = rebuild_column_store(repository, store, workers)
+    click.echo(f"Wrote {n} feeds to {store.location}.")
+
+
+@dfes.command(name="calendar", help="List the days total fire bans were declared")
+@click.option("--district", "-d", help="Only list days with a ban in this district")
+@click.option("--start", "-s", type=click.DateTime(formats=["%Y-%m-%d"]))
+@click.option("--end", "-e", type=click.DateTime(formats=["%Y-%m-%d"]))
+@click.option("--rebuild", is_flag=True, help="Regenerate the calendar from stored feeds")
+@click.pass_obj
+def calendar(repository, district, start, end, rebuild):
+    days = open_calendar(repository, rebuild)
+    start, end = start and start.date(), end and end.date()
+
+    if district:
+        for code in district_codes(district):
+            for day in days.dates(code, start=start, end=end):
+                click.echo(f"{day:%Y-%m-%d}  {' / '.join(LOCATIONS.pair(code))}")
+        return
+
+    for day in days.days():
+        if (start and day < start) or (end and day > end):
+            continue
+        declared, revoked = days.codes(day), days.codes(day, REVOKED)
+        if declared:
+            click.echo(f"{day:%Y-%m-%d}  {district_names(declared)}")
+        if revoked:
+            click.echo(f"{day:%Y-%m-%d}  revoked: {district_names(revoked)}")
+
+
+@dfes.command(name="stats", help="Count the days each district had a total fire ban")
+@click.option("--start", "-s", type=click.DateTime(formats=["%Y-%m-%d"]))
+@click.option("--end", "-e", type=click.DateTime(formats=["%Y-%m-%d"]))
+@click.option("--rebuild", is_flag=True, help="Regenerate the calendar from stored feeds")
+@click.pass_obj
+def stats(repository, start, end, rebuild):
+    days = open_calendar(repository, rebuild)
+    start, end = start and start.date(), end and end.date()
+    counts = [(days.count(code, start=start, end=end), code) for code in range(len(LOCATIONS))]
+
+    for n, code in sorted(counts, key=lambda count: (-count[0], LOCATIONS.pair(count[1]))):
+        if n:
+            click.echo(f"{n:5d}  {' / '.join(LOCATIONS.pair(code))}")
+
+
+def open_calendar(repository, rebuild):
+    days = ban_calendar(repository.location)
+    if rebuild or not days.exists():
+        rebuild_calendar(repository, days)
+    return days
+
+
+def district_codes(district):
+    codes = [code for code, (_, name) in enumerate(LOCATIONS.pairs()) if name == district]
+    if not codes:
+        raise click.BadParameter(f"Unknown district \"{district}\"", param_hint="--district")
+    return codes
+
+
+def district_names(codes):
+    return ", ".join(LOCATIONS.pair(code)[1] for code in codes)
+
 
 @dfes.command(name="display", help="Display feeds in repository")
 @click.option("--start", "-s", type=click.DateTime())
 @click.option("--end", "-e", type=click.DateTime())
-def display(start, end):
-    display_feeds(start, end)
+@click.option("--workers", "-w", type=int, default=1, help="Parse feeds in this many processes")
+@click.pass_obj
+def display(repository, start, end, workers):
+    display_feeds(repository, start, end, feed_cache(repository.location), workers)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,121 @@
+import bisect
+import hashlib
+import json
+import re
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+PLACEHOLDER = "\x00"
+
+
+def digest(body: str) -> str:
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def split_stamp(feed_text: str) -> tuple[str, str | None]:
+    if PLACEHOLDER in feed_text:
+        return feed_text, None
+
+    if m := re.search(r"<pubDate>(.*?)</pubDate>", feed_text, flags=re.DOTALL):
+        body = feed_text[:m.start(1)] + PLACEHOLDER + feed_text[m.end(1):]
+        return body, m.group(1)
+
+    return feed_text, None
+
+
+def join_stamp(body: str, stamp: str | None) -> str:
+    if stamp is None:
+        return body
+    return body.replace(PLACEHOLDER, stamp, 1)
+
+
+class BlobStore:
+    def __init__(self, location: Path):
+        self._location = location
+        self._location.mkdir(parents=True, exist_ok=True)
+
+    def put(self, body: str) -> str:
+        key = digest(body)
+        path = self._path(key)
+
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            temporary = path.with_suffix(".tmp")
+            temporary.write_bytes(zlib.compress(body.encode(), 9))
+            temporary.replace(path)
+
+        return key
+
+    def get(self, key: str) -> str:
+        return zlib.decompress(self._path(key).read_bytes()).decode()
+
+    def keys(self) -> list[str]:
+        return sorted(path.stem for path in self._location.glob("*/*.z"))
+
+    def _path(self, key: str) -> Path:
+        return self._location / key[:2] / f"{key}.z"
+
+
+@dataclass(frozen=True)
+class TimelineEntry:
+    at: datetime
+    key: str
+    stamp: str | None
+
+
+def to_record(entry: TimelineEntry) -> str:
+    return json.dumps({"at": entry.at.isoformat(), "key": entry.key, "stamp": entry.stamp}) + "\n"
+
+
+def from_record(record: str) -> TimelineEntry:
+    fields = json.loads(record)
+    return TimelineEntry(
+        at=datetime.fromisoformat(fields["at"]),
+        key=fields["key"],
+        stamp=fields["stamp"],
+    )
+
+
+def stat_key(path: Path) -> tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+class Timeline:
+    def __init__(self, path: Path):
+        self._path = path
+        self._path.touch()
+        self._entries: dict[datetime, TimelineEntry] = {}
+        self._times: list[datetime] = []
+        self._loaded: tuple[int, int] | None = None
+
+    def add(self, entry: TimelineEntry) -> None:
+        self._refresh()
+
+        with self._path.open("a") as timeline:
+            timeline.write(to_record(entry))
+
+        if entry.at not in self._entries:
+            bisect.insort(self._times, entry.at)
+        self._entries[entry.at] = entry
+        self._loaded = stat_key(self._path)
+
+    def get(self, at: datetime) -> TimelineEntry | None:
+        self._refresh()
+        return self._entries.get(at)
+
+    def times(self) -> list[datetime]:
+        self._refresh()
+        return list(self._times)
+
+    def _refresh(self) -> None:
+        loaded = stat_key(self._path)
+
+        if loaded != self._loaded:
+            with self._path.open() as timeline:
+                entries = (from_record(record) for record in timeline)
+                self._entries = {entry.at: entry for entry in entries}
+            self._times = sorted(self._entries)
+            self._loaded = loaded
@@ -1,9 +1,12 @@
 import re
-from datetime import date, time, datetime
+from datetime import date, time, datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from zoneinfo import ZoneInfo
 
 from dfes.exceptions import ParsingFailed
 
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
 
 def extract_date(text: str) -> date:
     return text_to_date(
@@ -45,3 +48,28 @@ def time_text(text: str) -> str:
 
 def to_perth_time(dt: datetime) -> datetime:
     return dt.astimezone(ZoneInfo("Australia/Perth"))
+
+
+def to_published(text: str) -> datetime:
+    text = text.strip()
+
+    try:
+        dt = parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        try:
+            dt = datetime.fromisoformat(text)
+        except ValueError:
+            raise ParsingFailed(f"Failed to parse pubDate: {text}")
+
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+
+    return dt.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def since_epoch(dt: datetime, unit: timedelta) -> int:
+    return (dt - EPOCH) // unit
+
+
+def epoch_microseconds(dt: datetime) -> int:
+    return since_epoch(dt, timedelta(microseconds=1))
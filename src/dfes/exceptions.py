@@ -1,2 +1,6 @@
 class ParsingFailed(Exception):
     pass
+
+
+class LocationConflict(Exception):
+    pass
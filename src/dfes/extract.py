@@ -0,0 +1,111 @@
+import re
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from dfes.date_time import extract_date, extract_time
+from dfes.exceptions import ParsingFailed
+from dfes.model import AffectedAreas, TotalFireBans
+
+TOKENS = re.compile(
+    r"<(?:span\b[^>]*>(?P<span>[^<]*)</span>"
+    r"|p\b[^>]*>(?P<p>[^<]*)</p>"
+    r"|strong\b[^>]*>(?P<strong>[^<]*)</strong>"
+    r"|li\b[^>]*>(?P<li>[^<]*)</li>"
+    r"|(?P<ul>ul)\b[^>]*>"
+    r"|(?P<end_ul>/ul)>)"
+)
+
+UNSUPPORTED = re.compile(r"&|<!|<[A-Z]")
+
+
+class Deviation(Exception):
+    pass
+
+
+def extract(description_html: str) -> TotalFireBans | None:
+    try:
+        return extract_template(description_html)
+    except (Deviation, ParsingFailed):
+        return None
+
+
+def extract_template(description_html: str) -> TotalFireBans:
+    if UNSUPPORTED.search(description_html):
+        raise Deviation("Markup outside the template")
+
+    spans: list[str] = []
+    paragraphs: list[str] = []
+    pairs: list[tuple[str, str]] = []
+    region: str | None = None
+    in_list, n_li, n_ul, n_regions = False, 0, 0, 0
+
+    for token in TOKENS.finditer(description_html):
+        if (kind := token.lastgroup) is None:
+            raise Deviation("Unrecognised tag")
+        text = token.group(kind)
+
+        if kind == "span":
+            spans.append(text)
+        elif kind == "p":
+            paragraphs.append(text)
+        elif kind == "strong" and "Region:" in text:
+            if region is not None or in_list:
+                raise Deviation("Region without districts")
+            region = text.removesuffix(" Region:")
+            n_regions += 1
+        elif kind == "ul":
+            if region is None or in_list:
+                raise Deviation("List without region")
+            in_list = True
+            n_ul += 1
+        elif kind == "end_ul":
+            if not in_list:
+                raise Deviation("Unbalanced list")
+            region, in_list = None, False
+        elif kind == "li":
+            if not in_list or region is None or not text:
+                raise Deviation("District outside region list")
+            pairs.append((region, text.removesuffix(" - All Day")))
+            n_li += 1
+
+    if in_list or region is not None:
+        raise Deviation("Unterminated region")
+
+    if (description_html.count("<li") != n_li
+            or description_html.count("<ul") != n_ul
+            or description_html.count("Region:") != n_regions):
+        raise Deviation("Tags the template does not account for")
+
+    issued = datetime.combine(
+        extract_date(first_containing(spans, "Date of issue:")),
+        extract_time(first_containing(spans, "Time of issue:")),
+        ZoneInfo(key='Australia/Perth')
+    )
+
+    if declared := find_containing(paragraphs, "A Total Fire Ban has been declared"):
+        revoked, declared_for = False, extract_date(declared)
+    else:
+        revoked, declared_for = True, extract_date(first_containing(paragraphs, "has been revoked"))
+
+    return TotalFireBans(
+        revoked=revoked,
+        issued=issued,
+        declared_for=declared_for,
+        locations=AffectedAreas(pairs),
+    )
+
+
+def first_containing(texts: list[str], contains: str) -> str:
+    if (text := find_containing(texts, contains)) is None:
+        raise Deviation(f"Nothing contains {contains}")
+    return text
+
+
+def find_containing(texts: list[str], contains: str) -> str | None:
+    for text in texts:
+        if contains in text:
+            if not text.strip():
+                raise Deviation("Empty tag")
+            return text.strip()
+
+    return None
@@ -1,20 +1,55 @@
+import os
 import time
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
+from functools import partial
+from itertools import islice
 
 import feedparser
 
-from dfes.bans import parse_bans
+from dfes.cache import FeedCache, repository_cache
 from dfes.exceptions import ParsingFailed
+from dfes.memo import cached_parse_bans
 from dfes.model import Item, Feed
+from dfes.repository import FeedByPublished, Repository
+from dfes.rss import RssStream, Unsupported
 
 
-def parse_feed(feed_xml: str) -> Feed:
+BANS_MODES = ("lazy", "eager", "none")
+
+
+def parse_feed(feed_xml: str, bans: str = "lazy") -> Feed:
+    if bans not in BANS_MODES:
+        raise ValueError(f"bans must be one of {BANS_MODES}")
+
+    try:
+        return stream_feed(feed_xml, bans)
+    except Unsupported:
+        return parse_feed_with_feedparser(feed_xml, bans)
+
+
+def stream_feed(feed_xml: str, bans: str = "lazy") -> Feed:
+    stream = RssStream(feed_xml)
+    entries = list(stream)
+    title, published = stream.header()
+
+    items = [to_item(utc_to_datetime(entry.published), entry.description, bans)
+             for entry in entries]
+
+    return Feed(
+        title=title,
+        published=utc_to_datetime(published),
+        items=items
+    )
+
+
+def parse_feed_with_feedparser(feed_xml: str, bans: str = "lazy") -> Feed:
     parsed = feedparser.parse(feed_xml)
 
     check(parsed)
 
-    entries = [create_item(entry_data)
+    entries = [create_item(entry_data, bans)
                for entry_data in parsed["entries"]]
 
     return Feed(
@@ -44,12 +79,22 @@ def feed_published(parsed: dict) -> datetime:
     return struct_time_to_datetime(s_t)
 
 
-def create_item(entry_data) -> Item:
-    return Item(
-        published=entry_published(entry_data),
-        description=description(entry_data)
+def create_item(entry_data, bans: str = "none") -> Item:
+    return to_item(entry_published(entry_data), description(entry_data), bans)
+
+
+def to_item(published: datetime, description_html: str, bans: str = "none") -> Item:
+    item = Item(
+        published=published,
+        description=description_html,
+        parse=cached_parse_bans if bans == "lazy" else None,
     )
 
+    if bans == "eager":
+        item.bans = cached_parse_bans(item.description)
+
+    return item
+
 
 def entry_published(entry: dict) -> datetime:
     s_t = entry["published_parsed"]
@@ -69,9 +114,53 @@ def struct_time_to_datetime(st: time.struct_time) -> datetime:
     return dt.replace(tzinfo=timezone.utc)
 
 
-def parse_feeds(feeds_text: Iterable[str]) -> Iterable[Feed]:
+def utc_to_datetime(dt: datetime) -> datetime:
+    return struct_time_to_datetime(dt.utctimetuple())
+
+
+def parse_feeds(feeds_text: Iterable[str], cache: FeedCache | None = None) -> Iterable[Feed]:
     for feed_text in feeds_text:
-        feed = parse_feed(feed_text)
-        for item in feed.items:
-            item.bans = parse_bans(item.description)
-        yield feed
+        yield parse_feed_and_bans(feed_text, cache)
+
+
+def parse_feed_and_bans(feed_text: str, cache: FeedCache | None = None) -> Feed:
+    if cache and (cached := cache.get(feed_text)):
+        return cached
+
+    feed = parse_feed(feed_text, bans="eager")
+
+    if cache:
+        cache.put(feed_text, feed)
+
+    return feed
+
+
+def parse_or_failure(feed_text: str, cache: FeedCache | None = None) -> Feed | ParsingFailed:
+    try:
+        return parse_feed_and_bans(feed_text, cache)
+    except ParsingFailed as failure:
+        return failure
+
+
+def parse_feeds_parallel(feeds_text: Iterable[str],
+                         workers: int | None = None,
+                         chunksize: int = 16,
+                         cache: FeedCache | None = None) -> Iterator[Feed | ParsingFailed]:
+    workers = workers or os.cpu_count() or 1
+    parse = partial(parse_or_failure, cache=cache)
+
+    if workers == 1:
+        yield from map(parse, feeds_text)
+        return
+
+    feeds_text = iter(feeds_text)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while batch := list(islice(feeds_text, workers * chunksize * 2)):
+            yield from executor.map(parse, batch, chunksize=chunksize)
+
+
+def stored_feeds(repository: Repository, workers: int | None = None) -> Iterator[Feed]:
+    parsed = parse_feeds_parallel(
+        FeedByPublished(repository).prefetch(), workers, cache=repository_cache(repository)
+    )
+    return (feed for feed in parsed if isinstance(feed, Feed))
@@ -2,11 +2,17 @@ from datetime import datetime
 
 import requests
 
-from dfes.bans import parse_bans
+from dfes.ban_calendar import BanCalendar
+from dfes.cache import FeedCache
+from dfes.columns import ColumnStore
 from dfes.exceptions import ParsingFailed
-from dfes.feeds import parse_feed
+from dfes.feeds import parse_or_failure
+from dfes.parser import probe
 from dfes.model import Feed
-from dfes.repository import Repository, FailedByFetched
+from dfes.repository import Repository
+from dfes.show import advance_snapshot
+from dfes.snapshot import SnapshotFile
+from dfes.timeline import Timeline, advance_timeline
 from dfes.urls import FIRE_BAN_URL
 
 
@@ -14,21 +20,48 @@ def aquire_ban_feed() -> str:
     return requests.get(FIRE_BAN_URL).text
 
 
-def store_feed(feed_xml: str, repository: Repository, now: datetime = datetime.now()):
+def store_feed(feed_xml: str, repository: Repository, now: datetime = datetime.now(),
+               cache: FeedCache | None = None, columns: ColumnStore | None = None,
+               calendar: BanCalendar | None = None, snapshot: SnapshotFile | None = None,
+               timeline: Timeline | None = None):
+    if already_stored(feed_xml, repository):
+        return
+
+    store_parsed(feed_xml, parse_or_failure(feed_xml), repository, now, cache, columns, calendar, snapshot, timeline)
+
+
+def already_stored(feed_xml: str, repository: Repository) -> bool:
     try:
-        feed = parse_feed(feed_xml)
-        check_description(feed)
-        repository.add_bans(feed.published, feed_xml)
+        published = probe(feed_xml).published
     except ParsingFailed:
+        return False
+
+    return repository.retrieve_bans(published) == feed_xml
+
+
+def store_parsed(feed_xml: str, parsed: Feed | ParsingFailed, repository: Repository, now: datetime,
+                 cache: FeedCache | None = None, columns: ColumnStore | None = None,
+                 calendar: BanCalendar | None = None, snapshot: SnapshotFile | None = None,
+                 timeline: Timeline | None = None):
+    if isinstance(parsed, ParsingFailed):
         if store_failed(repository, feed_xml):
             repository.add_failed(feed_xml, now)
+        return
 
-
-def check_description(feed: Feed):
-    for item in feed.items:
-        item.bans = parse_bans(item.description)
+    published = repository.published() if snapshot or timeline else []
+    if snapshot:
+        advance_snapshot(snapshot, parsed, published)
+    if timeline:
+        advance_timeline(timeline, parsed, published)
+    repository.add_bans(parsed.published, feed_xml)
+    if cache:
+        cache.put(feed_xml, parsed)
+    if columns:
+        columns.append(parsed)
+    if calendar and calendar.exists():
+        calendar.update([parsed])
 
 
 def store_failed(repository: Repository, feed_xml: str) -> bool:
-    failed = FailedByFetched(repository)
-    return len(failed) == 0 or failed[-1] != feed_xml
+    last = repository.last_failed()
+    return last is None or repository.retrieve_failed(last) != feed_xml
@@ -0,0 +1,135 @@
+import bisect
+import hashlib
+import os
+import threading
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    published: datetime
+    file_name: str
+    size: int
+    content_hash: str
+
+
+def to_line(entry: ManifestEntry) -> str:
+    return f"{entry.published.isoformat()}\t{entry.file_name}\t{entry.size}\t{entry.content_hash}\n"
+
+
+def from_line(line: str) -> ManifestEntry:
+    published, file_name, size, content_hash = line.rstrip("\n").split("\t")
+    return ManifestEntry(
+        published=datetime.fromisoformat(published),
+        file_name=file_name,
+        size=int(size),
+        content_hash=content_hash,
+    )
+
+
+def entry_for_file(path: Path, published: datetime) -> ManifestEntry:
+    contents = path.read_bytes()
+    return ManifestEntry(
+        published=published,
+        file_name=path.name,
+        size=len(contents),
+        content_hash=hashlib.sha256(contents).hexdigest(),
+    )
+
+
+def directory_mtime(directory: Path) -> int:
+    return directory.stat().st_mtime_ns
+
+
+def latest_by_published(entries: Iterable[ManifestEntry]) -> list[ManifestEntry]:
+    by_published = {entry.published: entry for entry in entries}
+    return sorted(by_published.values(), key=lambda entry: entry.published)
+
+
+class Manifest:
+    def __init__(self, directory: Path,
+                 scan: Callable[[], Iterable[tuple[Path, datetime]]],
+                 file_names: Callable[[], Iterable[str]]):
+        self._directory = directory
+        self._scan = scan
+        self._file_names = file_names
+        self._index = directory / "index"
+        self._path = self._index / "manifest.tsv"
+        self._stamp = self._index / "manifest.stamp"
+        self._index.mkdir(exist_ok=True)
+        self._entries: list[ManifestEntry] = []
+        self._published: list[datetime] = []
+        self._loaded: tuple[int, int] | None = None
+        self._lock = threading.RLock()
+
+    def in_sync(self) -> bool:
+        try:
+            if int(self._stamp.read_text()) == directory_mtime(self._directory):
+                return True
+            recorded = self._recorded_names()
+        except (OSError, ValueError, IndexError):
+            return False
+
+        if recorded != set(self._file_names()):
+            return False
+        self.mark_in_sync()
+        return True
+
+    def mark_in_sync(self) -> None:
+        self._stamp.write_text(str(directory_mtime(self._directory)))
+
+    def _recorded_names(self) -> set[str]:
+        with self._path.open() as manifest:
+            return {line.split("\t")[1] for line in manifest}
+
+    def append(self, entry: ManifestEntry) -> None:
+        with self._path.open("a") as manifest:
+            manifest.write(to_line(entry))
+        self.mark_in_sync()
+
+    def rebuild(self) -> None:
+        entries = latest_by_published(
+            entry_for_file(path, published) for path, published in self._scan()
+        )
+        temporary = self._path.with_suffix(f".{os.getpid()}.tmp")
+        temporary.write_text("".join(to_line(entry) for entry in entries))
+        temporary.replace(self._path)
+        self.mark_in_sync()
+
+    def entries(self) -> list[ManifestEntry]:
+        with self._lock:
+            self._refresh()
+            return self._entries
+
+    def published(self) -> list[datetime]:
+        with self._lock:
+            self._refresh()
+            return list(self._published)
+
+    def entry(self, published: datetime) -> ManifestEntry | None:
+        with self._lock:
+            self._refresh()
+            index = bisect.bisect_left(self._published, published)
+            if index < len(self._published) and self._published[index] == published:
+                return self._entries[index]
+            return None
+
+    def _refresh(self) -> None:
+        with self._lock:
+            if not self.in_sync():
+                self.rebuild()
+
+            stat = self._path.stat()
+            loaded = (stat.st_mtime_ns, stat.st_size)
+
+            if loaded != self._loaded:
+                self._load()
+                self._loaded = loaded
+
+    def _load(self) -> None:
+        with self._path.open() as manifest:
+            self._entries = latest_by_published(from_line(line) for line in manifest)
+        self._published = [entry.published for entry in self._entries]
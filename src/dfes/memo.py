@@ -0,0 +1,95 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from dfes.bans import parse_bans
+from dfes.model import TotalFireBans
+
+MAX_ENTRIES = 4096
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+def description_key(description_html: str) -> str:
+    return hashlib.sha256(description_html.encode()).hexdigest()
+
+
+class DiskTier:
+    def __init__(self, path: Path):
+        self._path = path
+        self._connection: sqlite3.Connection | None = None
+        self._pid: int | None = None
+
+    def get(self, key: str) -> TotalFireBans | None:
+        row = self._connect().execute("SELECT bans FROM bans WHERE key = ?", (key,)).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def put(self, key: str, bans: TotalFireBans) -> None:
+        with self._connect() as connection:
+            connection.execute("INSERT OR REPLACE INTO bans VALUES (?, ?)", (key, pickle.dumps(bans)))
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None or self._pid != os.getpid():
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self._path, timeout=30)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS bans (key TEXT PRIMARY KEY, bans BLOB NOT NULL) WITHOUT ROWID"
+            )
+            self._pid = os.getpid()
+        return self._connection
+
+
+class BansCache:
+    def __init__(self, max_entries: int = MAX_ENTRIES, disk: DiskTier | None = None):
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, TotalFireBans] = OrderedDict()
+        self._disk = disk
+        self.stats = CacheStats()
+
+    def parse(self, description_html: str) -> TotalFireBans:
+        key = description_key(description_html)
+
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return self._entries[key]
+
+        if self._disk and (bans := self._disk.get(key)):
+            self.stats.disk_hits += 1
+        else:
+            bans = parse_bans(description_html)
+            self.stats.misses += 1
+            if self._disk:
+                self._disk.put(key, bans)
+
+        self._remember(key, bans)
+        return bans
+
+    def use_disk(self, disk: DiskTier | None) -> None:
+        self._disk = disk
+
+    def _remember(self, key: str, bans: TotalFireBans) -> None:
+        self._entries[key] = bans
+        if len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+BANS_CACHE = BansCache()
+
+
+def cached_parse_bans(description_html: str) -> TotalFireBans:
+    return BANS_CACHE.parse(description_html)
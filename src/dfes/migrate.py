@@ -1,9 +1,14 @@
 import re
+from datetime import datetime
 from pathlib import Path
 from typing import Iterator
 
-from dfes.fetch import store_feed
-from dfes.repository import FileRepository
+from dfes.ban_calendar import BanCalendar
+from dfes.columns import ColumnStore
+from dfes.feeds import parse_feeds_parallel, stored_feeds
+from dfes.fetch import store_parsed
+from dfes.repository import FileRepository, ContentRepository, Repository, to_failed_file_name
+from dfes.timeline import Timeline
 
 
 def do_migration(repository: FileRepository) -> None:
@@ -11,9 +16,12 @@ def do_migration(repository: FileRepository) -> None:
     delete_missing_seconds(repository.location)
 
 
-def migrate_to_seconds(repository: FileRepository) -> None:
-    for missing in missing_seconds(repository.location):
-        store_feed(missing.read_text(), repository)
+def migrate_to_seconds(repository: FileRepository, workers: int | None = None) -> None:
+    feeds_text = [missing.read_text() for missing in missing_seconds(repository.location)]
+    now = datetime.now()
+
+    for feed_text, parsed in zip(feeds_text, parse_feeds_parallel(feeds_text, workers)):
+        store_parsed(feed_text, parsed, repository, now)
 
 
 def missing_seconds(repository_directory: Path) -> Iterator[Path]:
@@ -31,3 +39,43 @@ def matches_missing(name: str) -> bool:
 def delete_missing_seconds(repository_directory: Path) -> None:
     for missing in missing_seconds(repository_directory):
         missing.unlink()
+
+
+def migrate_to_content(repository: FileRepository, remove_files: bool = False) -> int:
+    content = ContentRepository(repository.location)
+    copied_bans, copied_failed = [], []
+
+    for published in repository.published():
+        feed_text = repository.retrieve_bans(published)
+        if feed_text is None:
+            continue
+        content.add_bans(published, feed_text)
+        if content.retrieve_bans(published) == feed_text:
+            copied_bans.append(published)
+
+    for fetched in repository.list_failed():
+        feed_text = repository.retrieve_failed(fetched)
+        if feed_text is None:
+            continue
+        content.add_failed(feed_text, fetched)
+        if content.retrieve_failed(fetched) == feed_text:
+            copied_failed.append(fetched)
+
+    if remove_files:
+        repository.remove_bans(copied_bans)
+        for fetched in copied_failed:
+            (repository.location / to_failed_file_name(fetched)).unlink()
+
+    return len(copied_bans) + len(copied_failed)
+
+
+def rebuild_column_store(repository: Repository, store: ColumnStore, workers: int | None = None) -> int:
+    return store.rebuild(stored_feeds(repository, workers))
+
+
+def rebuild_calendar(repository: Repository, calendar: BanCalendar, workers: int | None = None) -> int:
+    return calendar.rebuild(stored_feeds(repository, workers))
+
+
+def rebuild_timeline(repository: Repository, timeline: Timeline, workers: int | None = None) -> int:
+    return timeline.rebuild(stored_feeds(repository, workers))
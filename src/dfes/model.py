@@ -1,11 +1,124 @@
+import hashlib
+import os
+import sys
 from collections import defaultdict
-from dataclasses import dataclass
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
 from datetime import datetime, date
+from pathlib import Path
 
+from dfes.exceptions import LocationConflict
 
-@dataclass
+
+class LocationCatalogue:
+    def __init__(self) -> None:
+        self._codes: dict[tuple[str, str], int] = {}
+        self._pairs: list[tuple[str, str]] = []
+        self._path: Path | None = None
+        self._pid: int | None = None
+
+    def code(self, region: str, district: str) -> int:
+        if (code := self._codes.get((region, district))) is None:
+            code = self._register(region, district)
+            if self._path and self._pid == os.getpid():
+                with self._path.open("a") as f:
+                    f.write(f"{region}\t{district}\n")
+        return code
+
+    def find(self, region: str, district: str) -> int | None:
+        return self._codes.get((region, district))
+
+    def use_file(self, path: Path) -> None:
+        stored = read_locations(path)
+        shared = min(len(stored), len(self._pairs))
+        if stored[:shared] != self._pairs[:shared]:
+            raise LocationConflict(f"Locations in {path} are numbered differently to those already in use")
+
+        for region, district in stored[shared:]:
+            self._register(region, district)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a") as f:
+            f.writelines(f"{region}\t{district}\n" for region, district in self._pairs[len(stored):])
+        self._path, self._pid = path, os.getpid()
+
+    def _register(self, region: str, district: str) -> int:
+        pair = (sys.intern(region), sys.intern(district))
+        code = self._codes[pair] = len(self._pairs)
+        self._pairs.append(pair)
+        return code
+
+    def pair(self, code: int) -> tuple[str, str]:
+        return self._pairs[code]
+
+    def pairs(self) -> list[tuple[str, str]]:
+        return list(self._pairs)
+
+    def __len__(self) -> int:
+        return len(self._pairs)
+
+
+LOCATIONS = LocationCatalogue()
+
+
+def read_locations(path: Path) -> list[tuple[str, str]]:
+    if not path.exists():
+        return []
+    return [(region, district) for region, district in (line.split("\t") for line in path.read_text().splitlines())]
+
+
+def to_mask(codes: Iterable[int]) -> int:
+    mask = 0
+    for code in codes:
+        mask |= 1 << code
+    return mask
+
+
+def from_mask(mask: int) -> Iterator[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+@dataclass(frozen=True, slots=True, init=False, repr=False)
 class AffectedAreas:
-    pairs: list[tuple[str, str]]
+    codes: tuple[int, ...]
+    mask: int = field(compare=False)
+
+    def __init__(self, pairs: Iterable[tuple[str, str]] = ()):
+        codes = tuple(LOCATIONS.code(region, district) for region, district in pairs)
+        object.__setattr__(self, "codes", codes)
+        object.__setattr__(self, "mask", to_mask(codes))
+
+    @classmethod
+    def from_codes(cls, codes: Iterable[int]) -> "AffectedAreas":
+        areas = object.__new__(cls)
+        codes = tuple(codes)
+        object.__setattr__(areas, "codes", codes)
+        object.__setattr__(areas, "mask", to_mask(codes))
+        return areas
+
+    @classmethod
+    def from_mask(cls, mask: int) -> "AffectedAreas":
+        return cls.from_codes(from_mask(mask))
+
+    def __contains__(self, pair: tuple[str, str]) -> bool:
+        code = LOCATIONS.find(*pair)
+        return code is not None and bool(self.mask >> code & 1)
+
+    def __or__(self, other: "AffectedAreas") -> "AffectedAreas":
+        return AffectedAreas.from_mask(self.mask | other.mask)
+
+    def __and__(self, other: "AffectedAreas") -> "AffectedAreas":
+        return AffectedAreas.from_mask(self.mask & other.mask)
+
+    def __sub__(self, other: "AffectedAreas") -> "AffectedAreas":
+        return AffectedAreas.from_mask(self.mask & ~other.mask)
+
+    @property
+    def pairs(self) -> list[tuple[str, str]]:
+        return [LOCATIONS.pair(code) for code in self.codes]
 
     def to_dict(self) -> dict:
         result = defaultdict(list)
@@ -14,8 +127,14 @@ class AffectedAreas:
 
         return result
 
+    def __reduce__(self):
+        return AffectedAreas, (self.pairs,)
+
+    def __repr__(self) -> str:
+        return f"AffectedAreas({self.pairs!r})"
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class TotalFireBans:
     issued: datetime
     declared_for: date
@@ -23,14 +142,41 @@ class TotalFireBans:
     revoked: bool = False
 
 
-@dataclass
 class Item:
-    published: datetime
-    description: str
-    bans: TotalFireBans | None = None
+    __slots__ = ("published", "description", "_bans", "_parse")
+
+    def __init__(self, published: datetime, description: str, bans: TotalFireBans | None = None,
+                 parse: Callable[[str], TotalFireBans] | None = None):
+        self.published = published
+        self.description = description
+        self._bans = bans
+        self._parse = parse
+
+    @property
+    def bans(self) -> TotalFireBans | None:
+        if self._bans is None and self._parse:
+            self._bans = self._parse(self.description)
+        return self._bans
+
+    @bans.setter
+    def bans(self, bans: TotalFireBans | None) -> None:
+        self._bans = bans
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Item):
+            return NotImplemented
+        return (self.published, self.description, self.bans) == (other.published, other.description, other.bans)
+
+    def __repr__(self) -> str:
+        return f"Item(published={self.published!r}, description={self.description!r}, bans={self._bans!r})"
+
+
+def entry_key(item: Item) -> int:
+    content = f"{item.published.isoformat()}\n{item.description}".encode()
+    return int.from_bytes(hashlib.sha256(content).digest()[:8])
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Feed:
     title: str
     published: datetime
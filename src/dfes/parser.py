@@ -1,13 +1,59 @@
+import re
+from dataclasses import dataclass
 from datetime import datetime
 
+from dfes.date_time import to_published
+from dfes.exceptions import ParsingFailed
 from dfes.feeds import parse_feed
+from dfes.model import Feed, Item
+
+PUB_DATE = re.compile(r"<pubDate>(.*?)</pubDate>", flags=re.DOTALL)
+
+
+@dataclass(frozen=True)
+class FeedHeader:
+    published: datetime
+    n_items: int
+
+
+def probe(feed_text: str) -> FeedHeader:
+    first_item = feed_text.find("<item")
+    header = feed_text if first_item == -1 else feed_text[:first_item]
+
+    if not (m := PUB_DATE.search(header)):
+        raise ParsingFailed("Feed pubDate not found")
+
+    return FeedHeader(
+        published=to_published(m.group(1)),
+        n_items=count_items(feed_text),
+    )
+
+
+def count_items(feed_text: str) -> int:
+    return feed_text.count("<item>") + feed_text.count("<item ")
 
 
 class Parser:
     def __init__(self, feed_text: str):
         self._feed_text = feed_text
-        self._feed = None
+        self._header: FeedHeader | None = None
+        self._feed: Feed | None = None
+
+    def header(self) -> FeedHeader:
+        if self._header is None:
+            self._header = probe(self._feed_text)
+        return self._header
 
     def feed_published(self) -> datetime:
-        self._feed = parse_feed(self._feed_text)
-        return self._feed.published
+        return self.header().published
+
+    def n_items(self) -> int:
+        return self.header().n_items
+
+    def feed(self) -> Feed:
+        if self._feed is None:
+            self._feed = parse_feed(self._feed_text)
+        return self._feed
+
+    def items(self) -> list[Item]:
+        return self.feed().items
@@ -3,10 +3,12 @@ from textwrap import wrap
 
 from rich import print
 
+from dfes.cache import FeedCache
 from dfes.date_time import to_perth_time
-from dfes.feeds import parse_feeds
+from dfes.exceptions import ParsingFailed
+from dfes.feeds import parse_feeds_parallel
 from dfes.model import TotalFireBans
-from dfes.repository import FileRepository, repository_location, FeedByPublished
+from dfes.repository import Repository, FeedByPublished
 
 
 def display_bans(latest_bans: tuple[TotalFireBans, ...]) -> None:
@@ -26,14 +28,18 @@ def print_ban(bans: TotalFireBans):
     print("")
 
 
-def display_feeds(start: datetime, end: datetime):
+def display_feeds(repository: Repository, start: datetime, end: datetime, cache: FeedCache | None = None,
+                  workers: int = 1):
     start = to_perth_time(start)
     end = to_perth_time(end)
 
-    repository = FileRepository(repository_location())
     to_show = FeedByPublished(repository, start=start, end=end)
-    feeds = list(parse_feeds(to_show))
+    feeds = list(parse_feeds_parallel(to_show.prefetch(), workers, cache=cache))
     for feed in feeds:
+        if isinstance(feed, ParsingFailed):
+            print(f"[bold red]Feed failed to parse: {feed}[/bold red]")
+            continue
+
         print(f"Feed Published: {feed.published}")
 
         if not feed.items:
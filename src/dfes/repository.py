@@ -1,8 +1,16 @@
+import bisect
 import re
-from collections.abc import Sequence
+import sqlite3
+from collections import deque
+from collections.abc import Sequence, Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Protocol
+from typing import Protocol, Iterator, TypeVar, overload
+
+from dfes.content import BlobStore, Timeline, TimelineEntry, split_stamp, join_stamp
+from dfes.manifest import Manifest, entry_for_file
+from dfes.segments import Segments
 
 
 class Repository(Protocol):
@@ -12,12 +20,16 @@ class Repository(Protocol):
 
     def published(self) -> list[datetime]: ...
 
+    def published_between(self, start: datetime | None, end: datetime | None) -> list[datetime]: ...
+
     def add_failed(self, feed_text: str, now: datetime) -> None: ...
 
     def retrieve_failed(self, retrieved_at: datetime) -> str | None: ...
 
     def list_failed(self) -> list[datetime]: ...
 
+    def last_failed(self) -> datetime | None: ...
+
 
 class InMemoryRepository:
     def __init__(self):
@@ -31,7 +43,10 @@ class InMemoryRepository:
         return self._ban_feeds.get(feed_published)
 
     def published(self) -> list[datetime]:
-        return list(self._ban_feeds)
+        return sorted(self._ban_feeds)
+
+    def published_between(self, start: datetime | None, end: datetime | None) -> list[datetime]:
+        return in_range(self.published(), start, end)
 
     def add_failed(self, feed_text: str, now: datetime) -> None:
         self._failed[now] = feed_text
@@ -42,6 +57,9 @@ class InMemoryRepository:
     def list_failed(self) -> list[datetime]:
         return list(self._failed)
 
+    def last_failed(self) -> datetime | None:
+        return next(reversed(self._failed), None)
+
 
 def to_bans_file_name(feed_published: datetime) -> str:
     return feed_published.strftime("bans_issued_%Y_%m_%d_%H%M%S.rss")
@@ -81,32 +99,76 @@ class FileRepository:
     def __init__(self, location: Path = repository_location()):
         self._location = location
         create_if_missing(self._location)
+        self._manifest = Manifest(self._location, self._bans_files, self._bans_file_names)
+        self._segments = Segments(self._location / "segments")
 
     def add_bans(self, feed_published: datetime, feed_text: str) -> None:
         name = self._location / to_bans_file_name(feed_published)
+        in_sync = self._manifest.in_sync()
         name.write_text(feed_text)
 
+        if in_sync:
+            self._manifest.append(
+                entry_for_file(name, to_feed_published_date(name.name))
+            )
+        else:
+            self._manifest.rebuild()
+
     def retrieve_bans(self, feed_published: datetime) -> str | None:
-        name = self._location / to_bans_file_name(feed_published)
-        if name.is_file():
-            return name.read_text()
+        file_name = to_bans_file_name(feed_published)
+        entry = self._manifest.entry(to_feed_published_date(file_name))
+        if entry:
+            return (self._location / entry.file_name).read_text()
         else:
-            return None
+            return self._segments.retrieve(to_feed_published_date(file_name))
 
     def published(self) -> list[datetime]:
-        file_paths = []
+        loose = self._manifest.published()
+        packed = self._segments.published()
+
+        if not packed:
+            return loose
+
+        return sorted(set(loose) | set(packed))
+
+    def published_between(self, start: datetime | None, end: datetime | None) -> list[datetime]:
+        return in_range(self.published(), start, end)
+
+    def compact(self, before: datetime) -> int:
+        to_pack = [published for published in self._manifest.published() if published < before]
 
+        self._segments.pack(
+            (published, (self._location / to_bans_file_name(published)).read_text()) for published in to_pack
+        )
+
+        for published in to_pack:
+            (self._location / to_bans_file_name(published)).unlink()
+
+        return len(to_pack)
+
+    def remove_bans(self, published: Iterable[datetime]) -> None:
+        published = list(published)
+        for feed_published in published:
+            (self._location / to_bans_file_name(feed_published)).unlink(missing_ok=True)
+        self._segments.discard(published)
+
+    def _bans_files(self) -> Iterator[tuple[Path, datetime]]:
+        for name in self._bans_file_names():
+            yield self._location / name, to_feed_published_date(name)
+
+    def _bans_file_names(self) -> Iterator[str]:
         for child in self._location.iterdir():
             if is_bans_file(child.name):
-                file_paths.append(child)
-
-        issued_dates = [to_feed_published_date(file_path.name) for file_path in file_paths]
-        return sorted(issued_dates)
+                yield child.name
 
     def add_failed(self, feed_text: str, now: datetime) -> None:
         name = self._location / to_failed_file_name(now)
+        in_sync = self._manifest.in_sync()
         name.write_text(feed_text)
 
+        if in_sync:
+            self._manifest.mark_in_sync()
+
     def retrieve_failed(self, retrieved_at: datetime) -> str | None:
         name = self._location / to_failed_file_name(retrieved_at)
         if name.is_file():
@@ -119,40 +181,293 @@ class FileRepository:
         timestamps = [to_failed_timestamp(file_path.name) for file_path in file_paths]
         return sorted(timestamps)
 
+    def last_failed(self) -> datetime | None:
+        file_paths = self._location.glob("failed_*.rss")
+        return max((to_failed_timestamp(file_path.name) for file_path in file_paths), default=None)
+
+    @property
+    def location(self) -> Path:
+        return self._location
+
+
+def to_sqlite_published(feed_published: datetime) -> str:
+    return feed_published.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def from_sqlite_published(text: str) -> datetime:
+    dt = datetime.strptime(text, "%Y-%m-%d %H:%M:%S")
+    return dt.replace(tzinfo=timezone.utc)
+
+
+def to_sqlite_bound(bound: datetime | None, unbounded: str) -> str:
+    return to_sqlite_published(bound.astimezone(timezone.utc)) if bound else unbounded
+
+
+def to_sqlite_fetched(timestamp: datetime) -> str:
+    return timestamp.strftime("%Y-%m-%d %H:%M")
+
+
+def from_sqlite_fetched(text: str) -> datetime:
+    dt = datetime.strptime(text, "%Y-%m-%d %H:%M")
+    return dt.replace(tzinfo=timezone.utc)
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bans (
+    published TEXT PRIMARY KEY,
+    feed_text TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS failed (
+    fetched TEXT PRIMARY KEY,
+    feed_text TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class SqliteRepository:
+    def __init__(self, location: Path = repository_location()):
+        self._location = location
+        create_if_missing(self._location)
+        self._connection = sqlite3.connect(self._location / "dfes.sqlite3", check_same_thread=False)
+        self._connection.executescript(SQLITE_SCHEMA)
+
+    def add_bans(self, feed_published: datetime, feed_text: str) -> None:
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO bans VALUES (?, ?)",
+                (to_sqlite_published(feed_published), feed_text)
+            )
+
+    def retrieve_bans(self, feed_published: datetime) -> str | None:
+        row = self._connection.execute(
+            "SELECT feed_text FROM bans WHERE published = ?",
+            (to_sqlite_published(feed_published),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def published(self) -> list[datetime]:
+        rows = self._connection.execute("SELECT published FROM bans ORDER BY published")
+        return [from_sqlite_published(row[0]) for row in rows]
+
+    def published_between(self, start: datetime | None, end: datetime | None) -> list[datetime]:
+        rows = self._connection.execute(
+            "SELECT published FROM bans WHERE published BETWEEN ? AND ? ORDER BY published",
+            (to_sqlite_bound(start, ""), to_sqlite_bound(end, "~"))
+        )
+        return [from_sqlite_published(row[0]) for row in rows]
+
+    def add_failed(self, feed_text: str, now: datetime) -> None:
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO failed VALUES (?, ?)",
+                (to_sqlite_fetched(now), feed_text)
+            )
+
+    def retrieve_failed(self, retrieved_at: datetime) -> str | None:
+        row = self._connection.execute(
+            "SELECT feed_text FROM failed WHERE fetched = ?",
+            (to_sqlite_fetched(retrieved_at),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def list_failed(self) -> list[datetime]:
+        rows = self._connection.execute("SELECT fetched FROM failed ORDER BY fetched")
+        return [from_sqlite_fetched(row[0]) for row in rows]
+
+    def last_failed(self) -> datetime | None:
+        row = self._connection.execute("SELECT max(fetched) FROM failed").fetchone()
+        return from_sqlite_fetched(row[0]) if row[0] else None
+
+    def import_from(self, source: Repository) -> int:
+        bans = (
+            (to_sqlite_published(published), source.retrieve_bans(published))
+            for published in source.published()
+        )
+
+        failed = (
+            (to_sqlite_fetched(fetched), source.retrieve_failed(fetched))
+            for fetched in source.list_failed()
+        )
+
+        with self._connection:
+            n_bans = self._connection.executemany("INSERT OR REPLACE INTO bans VALUES (?, ?)", bans).rowcount
+            n_failed = self._connection.executemany("INSERT OR REPLACE INTO failed VALUES (?, ?)", failed).rowcount
+
+        return n_bans + n_failed
+
+    @property
+    def location(self) -> Path:
+        return self._location
+
+
+def to_content_published(feed_published: datetime) -> datetime:
+    return feed_published.replace(microsecond=0, tzinfo=timezone.utc)
+
+
+def to_content_fetched(timestamp: datetime) -> datetime:
+    return timestamp.replace(second=0, microsecond=0, tzinfo=timezone.utc)
+
+
+class ContentRepository:
+    def __init__(self, location: Path = repository_location()):
+        self._location = location
+        content = self._location / "content"
+        create_if_missing(content)
+        self._blobs = BlobStore(content / "blobs")
+        self._bans = Timeline(content / "bans.jsonl")
+        self._failed = Timeline(content / "failed.jsonl")
+
+    def add_bans(self, feed_published: datetime, feed_text: str) -> None:
+        add_to_timeline(self._blobs, self._bans, to_content_published(feed_published), feed_text)
+
+    def retrieve_bans(self, feed_published: datetime) -> str | None:
+        return retrieve_from_timeline(self._blobs, self._bans, to_content_published(feed_published))
+
+    def published(self) -> list[datetime]:
+        return self._bans.times()
+
+    def published_between(self, start: datetime | None, end: datetime | None) -> list[datetime]:
+        return in_range(self.published(), start, end)
+
+    def add_failed(self, feed_text: str, now: datetime) -> None:
+        add_to_timeline(self._blobs, self._failed, to_content_fetched(now), feed_text)
+
+    def retrieve_failed(self, retrieved_at: datetime) -> str | None:
+        return retrieve_from_timeline(self._blobs, self._failed, to_content_fetched(retrieved_at))
+
+    def list_failed(self) -> list[datetime]:
+        return self._failed.times()
+
+    def last_failed(self) -> datetime | None:
+        times = self._failed.times()
+        return times[-1] if times else None
+
+    def content_key(self, feed_published: datetime) -> str | None:
+        if entry := self._bans.get(to_content_published(feed_published)):
+            return entry.key
+        return None
+
     @property
     def location(self) -> Path:
         return self._location
 
 
+def add_to_timeline(blobs: BlobStore, timeline: Timeline, at: datetime, feed_text: str) -> None:
+    body, stamp = split_stamp(feed_text)
+    key = blobs.put(body)
+    entry = TimelineEntry(at=at, key=key, stamp=stamp)
+
+    if timeline.get(at) != entry:
+        timeline.add(entry)
+
+
+def retrieve_from_timeline(blobs: BlobStore, timeline: Timeline, at: datetime) -> str | None:
+    if entry := timeline.get(at):
+        return join_stamp(blobs.get(entry.key), entry.stamp)
+    return None
+
+
+BACKENDS = ("file", "sqlite", "content")
+
+
+def open_repository(backend: str, location: Path = repository_location()) -> Repository:
+    if backend == "sqlite":
+        return SqliteRepository(location)
+    if backend == "content":
+        return ContentRepository(location)
+    return FileRepository(location)
+
+
+PREFETCH_DEPTH = 8
+T = TypeVar("T")
+
+
+def read_ahead(read: Callable[[datetime], T],
+               keys: Iterable[datetime],
+               depth: int) -> Iterator[T]:
+    if depth < 1:
+        yield from (read(key) for key in keys)
+        return
+
+    with ThreadPoolExecutor(max_workers=depth) as executor:
+        pending: deque[Future[T]] = deque()
+        try:
+            for key in keys:
+                pending.append(executor.submit(read, key))
+                if len(pending) > depth:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def in_range(published_at: list[datetime],
+             start: datetime | None,
+             end: datetime | None) -> list[datetime]:
+    first = bisect.bisect_left(published_at, start) if start else 0
+    last = bisect.bisect_right(published_at, end) if end else len(published_at)
+    return published_at[first:last]
+
+
 class FeedByPublished(Sequence):
     def __init__(self, repository: Repository,
-                 start: datetime = None,
-                 end: datetime = None):
+                 start: datetime | None = None,
+                 end: datetime | None = None):
         self.repository = repository
         self._start = start
         self._end = end
+        self._published: list[datetime] | None = None
 
     def __len__(self) -> int:
         return len(self.published())
 
     def published(self) -> list[datetime]:
-        published_at = self.repository.published()
+        if self._published is None:
+            if self._start or self._end:
+                self._published = self.repository.published_between(self._start, self._end)
+            else:
+                self._published = self.repository.published()
+        return self._published
 
-        if not published_at:
-            return []
+    @overload
+    def __getitem__(self, index: int) -> str: ...
 
-        if not self._start:
-            self._start = published_at[0]
+    @overload
+    def __getitem__(self, index: slice) -> "FeedByPublished": ...
 
-        if not self._end:
-            self._end = published_at[-1]
+    def __getitem__(self, index: int | slice) -> "str | FeedByPublished":
+        if isinstance(index, slice):
+            return self._sliced(index)
 
-        return [at for at in published_at
-                if self._start <= at <= self._end]
+        return self.retrieve(self.published()[index])
 
-    def __getitem__(self, index: int) -> str:
-        feed_published = self.published()[index]
-        return self.repository.retrieve_bans(feed_published)
+    def __iter__(self) -> Iterator[str]:
+        for feed_published in self.published():
+            yield self.retrieve(feed_published)
+
+    def __reversed__(self) -> Iterator[str]:
+        for feed_published in reversed(self.published()):
+            yield self.retrieve(feed_published)
+
+    def retrieve(self, feed_published: datetime) -> str:
+        if (feed_text := self.repository.retrieve_bans(feed_published)) is None:
+            raise KeyError(f"No feed published at {feed_published}")
+        return feed_text
+
+    def prefetch(self, depth: int = PREFETCH_DEPTH) -> Iterator[str]:
+        return read_ahead(self.retrieve, self.published(), depth)
+
+    def prefetch_reversed(self, depth: int = PREFETCH_DEPTH) -> Iterator[str]:
+        return read_ahead(self.retrieve, reversed(self.published()), depth)
+
+    def _sliced(self, index: slice) -> "FeedByPublished":
+        sliced = FeedByPublished(self.repository)
+        sliced._published = self.published()[index]
+        return sliced
 
 
 class FailedByFetched(Sequence):
@@ -0,0 +1,158 @@
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from xml.etree.ElementTree import Element, ParseError, XMLPullParser
+
+from dfes.date_time import to_published
+from dfes.exceptions import ParsingFailed
+
+CHUNK_SIZE = 64 * 1024
+
+PROLOGUE = re.compile(r"\s*(?:<\?xml version=\"1\.0\"(?: encoding=\"(?i:utf-8)\")?\s*\?>\s*)?<rss\b")
+
+RFC822_DATE = re.compile(r"(?:[A-Z][a-z]{2}, )?\d{1,2} [A-Z][a-z]{2} \d{4} \d{2}:\d{2}(?::\d{2})? (?:[+-]\d{4}|GMT|UT)")
+ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[+-]\d{2}:\d{2}|Z)")
+
+CHANNEL_TAGS = {"title", "link", "description", "language", "copyright", "pubDate", "ttl", "item"}
+ITEM_TAGS = {"title", "link", "description", "pubDate", "guid"}
+
+HTML_TAGS = {"div", "p", "span", "strong", "em", "b", "i", "ul", "ol", "li", "br"}
+MARKUP = re.compile(r"<(?P<closing>/?)(?P<name>[a-z]+)(?P<attributes>(?: [a-z]+=\"[^\"<>]*\")*)(?P<empty> /)?>")
+STYLE = re.compile(r" style=\"(?:color: #[0-9a-f]{6}|font-weight: bold);\"")
+UNSAFE_TEXT = re.compile(r"[<>]|&(?!amp;|nbsp;)")
+
+
+class Unsupported(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Entry:
+    published: datetime
+    description: str
+
+
+class RssStream:
+    def __init__(self, feed_xml: str, chunk_size: int = CHUNK_SIZE):
+        self._feed_xml = feed_xml
+        self._chunk_size = chunk_size
+        self.title: str | None = None
+        self.published: datetime | None = None
+
+    def __iter__(self) -> Iterator[Entry]:
+        if not PROLOGUE.match(self._feed_xml):
+            raise Unsupported("Prologue differs from a plain RSS document")
+
+        parser: XMLPullParser[Element] = XMLPullParser(events=("start", "end"))
+        path: list[Element] = []
+        fields: dict[str, str] = {}
+
+        try:
+            for start in range(0, len(self._feed_xml), self._chunk_size):
+                parser.feed(self._feed_xml[start:start + self._chunk_size])
+                yield from self._events(parser.read_events(), path, fields)
+            parser.close()
+            yield from self._events(parser.read_events(), path, fields)
+        except ParseError:
+            raise Unsupported("Feed is not well formed")
+
+        self.header()
+
+    def header(self) -> tuple[str, datetime]:
+        if self.title is None or self.published is None:
+            raise Unsupported("Channel title or pubDate missing")
+        return self.title, self.published
+
+    def _events(self, events, path: list[Element], fields: dict[str, str]) -> Iterator[Entry]:
+        for event, element in events:
+            if event == "start":
+                check_placement(element.tag, path)
+                path.append(element)
+                continue
+
+            path.pop()
+            depth = len(path)
+
+            if depth == 2 and element.tag == "title":
+                self.title = channel_title(element.text)
+            elif depth == 2 and element.tag == "pubDate":
+                self.published = strict_published(element.text)
+            elif depth == 3 and element.tag in fields:
+                raise Unsupported(f"Item has more than one {element.tag}")
+            elif depth == 3:
+                fields[element.tag] = element.text or ""
+            elif depth == 2 and element.tag == "item":
+                yield to_entry(fields)
+                fields.clear()
+                path[-1].remove(element)
+
+
+def check_placement(tag: str, path: list[Element]) -> None:
+    depth = len(path)
+    allowed = (
+        depth == 0 and tag == "rss"
+        or depth == 1 and tag == "channel"
+        or depth == 2 and path[1].tag == "channel" and tag in CHANNEL_TAGS
+        or depth == 3 and path[2].tag == "item" and tag in ITEM_TAGS
+    )
+
+    if not allowed:
+        raise Unsupported(f"Element {tag} is outside the DFES RSS shape")
+
+
+def channel_title(text: str | None) -> str:
+    if not text or not text.strip() or re.search(r"[&<>]", text):
+        raise Unsupported("Title needs sanitising")
+    return text.strip()
+
+
+def strict_published(text: str | None) -> datetime:
+    text = (text or "").strip()
+
+    if not (RFC822_DATE.fullmatch(text) or ISO_DATE.fullmatch(text)):
+        raise Unsupported(f"Date format not handled: {text}")
+
+    try:
+        return to_published(text)
+    except ParsingFailed:
+        raise Unsupported(f"Date not handled: {text}")
+
+
+def to_entry(fields: dict[str, str]) -> Entry:
+    if "pubDate" not in fields:
+        raise Unsupported("Item has no pubDate")
+
+    description = fields.get("description", "").strip()
+
+    if not description or not canonical_html(description):
+        raise Unsupported("Description needs sanitising")
+
+    return Entry(published=strict_published(fields["pubDate"]), description=description)
+
+
+def canonical_html(html: str) -> bool:
+    open_tags = []
+    position = 0
+
+    for tag in MARKUP.finditer(html):
+        if UNSAFE_TEXT.search(html, position, tag.start()):
+            return False
+        position = tag.end()
+
+        closing, name, attributes, empty = tag.group("closing", "name", "attributes", "empty")
+
+        if name not in HTML_TAGS:
+            return False
+
+        if name == "br":
+            if closing or attributes or not empty:
+                return False
+        elif empty or (attributes and not STYLE.fullmatch(attributes)):
+            return False
+        elif not closing:
+            open_tags.append(name)
+        elif attributes or not open_tags or open_tags.pop() != name:
+            return False
+
+    return not open_tags and not UNSAFE_TEXT.search(html, position)
@@ -0,0 +1,138 @@
+import bisect
+import mmap
+import zlib
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class Packed:
+    published: datetime
+    segment: str
+    offset: int
+    length: int
+
+
+def to_segment_name(published: datetime) -> str:
+    return published.strftime("%Y_%m")
+
+
+def to_index_line(packed: Packed) -> str:
+    return f"{packed.published.isoformat()}\t{packed.offset}\t{packed.length}\n"
+
+
+def from_index_line(segment: str, line: str) -> Packed:
+    published, offset, length = line.rstrip("\n").split("\t")
+    return Packed(
+        published=datetime.fromisoformat(published),
+        segment=segment,
+        offset=int(offset),
+        length=int(length),
+    )
+
+
+def group_by_segment(feeds: Iterable[tuple[datetime, str]]) -> dict[str, dict[datetime, str]]:
+    groups: defaultdict[str, dict[datetime, str]] = defaultdict(dict)
+    for published, feed_text in feeds:
+        groups[to_segment_name(published)][published] = feed_text
+    return groups
+
+
+class Segments:
+    def __init__(self, location: Path):
+        self._location = location
+        self._location.mkdir(exist_ok=True)
+        self._packed: list[Packed] = []
+        self._published: list[datetime] = []
+        self._maps: dict[str, mmap.mmap] = {}
+        self._loaded: int | None = None
+
+    def published(self) -> list[datetime]:
+        self._refresh()
+        return list(self._published)
+
+    def retrieve(self, published: datetime) -> str | None:
+        self._refresh()
+        index = bisect.bisect_left(self._published, published)
+
+        if index == len(self._published) or self._published[index] != published:
+            return None
+
+        return self._read(self._packed[index])
+
+    def pack(self, feeds: Iterable[tuple[datetime, str]]) -> None:
+        for segment, by_published in group_by_segment(feeds).items():
+            self._write(segment, self._unpacked(segment) | by_published)
+
+    def discard(self, published: Iterable[datetime]) -> None:
+        self._refresh()
+        discarded = set(published)
+
+        for segment in {packed.segment for packed in self._packed if packed.published in discarded}:
+            kept = {
+                packed_at: feed_text for packed_at, feed_text in self._unpacked(segment).items()
+                if packed_at not in discarded
+            }
+            if kept:
+                self._write(segment, kept)
+            else:
+                self._remove(segment)
+
+    def _unpacked(self, segment: str) -> dict[datetime, str]:
+        self._refresh()
+        return {
+            packed.published: self._read(packed)
+            for packed in self._packed if packed.segment == segment
+        }
+
+    def _read(self, packed: Packed) -> str:
+        data = self._map(packed.segment)[packed.offset:packed.offset + packed.length]
+        return zlib.decompress(data).decode()
+
+    def _write(self, segment: str, by_published: dict[datetime, str]) -> None:
+        data = self._location / f"{segment}.seg"
+        index = self._location / f"{segment}.idx"
+        lines = []
+        offset = 0
+
+        with data.with_suffix(".seg.tmp").open("wb") as packed:
+            for published in sorted(by_published):
+                compressed = zlib.compress(by_published[published].encode(), 9)
+                packed.write(compressed)
+                lines.append(to_index_line(Packed(published, segment, offset, len(compressed))))
+                offset += len(compressed)
+
+        index.with_suffix(".idx.tmp").write_text("".join(lines))
+        data.with_suffix(".seg.tmp").replace(data)
+        index.with_suffix(".idx.tmp").replace(index)
+        self._maps.pop(segment, None)
+
+    def _remove(self, segment: str) -> None:
+        self._maps.pop(segment, None)
+        (self._location / f"{segment}.idx").unlink()
+        (self._location / f"{segment}.seg").unlink()
+
+    def _map(self, segment: str) -> mmap.mmap:
+        if segment not in self._maps:
+            with (self._location / f"{segment}.seg").open("rb") as data:
+                self._maps[segment] = mmap.mmap(data.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._maps[segment]
+
+    def _refresh(self) -> None:
+        loaded = self._location.stat().st_mtime_ns
+
+        if loaded == self._loaded:
+            return
+
+        packed: list[Packed] = []
+        for index in self._location.glob("*.idx"):
+            with index.open() as lines:
+                packed.extend(from_index_line(index.stem, line) for line in lines)
+
+        self._packed = sorted(packed, key=lambda entry: entry.published)
+        self._published = [entry.published for entry in self._packed]
+        self._maps.clear()
+        self._loaded = loaded
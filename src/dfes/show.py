@@ -1,20 +1,47 @@
 from collections.abc import Iterable
+from datetime import datetime
 
+from dfes.cache import FeedCache
 from dfes.feeds import parse_feeds
 from dfes.model import TotalFireBans, Item, Feed
 from dfes.repository import Repository, FeedByPublished
+from dfes.snapshot import Snapshot, SnapshotFile
 
 
-def to_show(repository: Repository) -> tuple[TotalFireBans, ...]:
-    return latest_bans(
+def to_show(repository: Repository, cache: FeedCache | None = None,
+            snapshot: SnapshotFile | None = None) -> tuple[TotalFireBans, ...]:
+    if snapshot and (current := snapshot.current(repository)):
+        return current.bans
+
+    bans = latest_bans(
         parse_feeds(
-            order_feeds(repository)
+            order_feeds(repository), cache
         )
     )
 
+    if snapshot and (published := repository.published()):
+        snapshot.write(Snapshot(published[-1], bans))
+
+    return bans
+
+
+def advance_snapshot(snapshot: SnapshotFile, feed: Feed, published: list[datetime]) -> None:
+    if published and feed.published < published[-1]:
+        return
+
+    try:
+        bans = latest_bans([feed])
+    except RuntimeError:
+        return
+
+    if bans or not published:
+        snapshot.write(Snapshot(feed.published, bans))
+    elif (previous := snapshot.read()) and previous.published == published[-1]:
+        snapshot.write(Snapshot(feed.published, previous.bans))
+
 
 def order_feeds(repository: Repository) -> Iterable[str]:
-    yield from reversed(FeedByPublished(repository))
+    yield from FeedByPublished(repository).prefetch_reversed(depth=2)
 
 
 def latest_bans(feeds: Iterable[Feed]) -> tuple[TotalFireBans, ...]:
@@ -38,19 +65,14 @@ def latest_bans(feeds: Iterable[Feed]) -> tuple[TotalFireBans, ...]:
 
 class LatestItems:
     def __init__(self, feed: Feed):
-        self._feed = feed
+        self._declared = last_issued_or_none(declared_items(feed))
+        self._revoked = last_issued_or_none(revoked_items(feed))
 
     def declared(self) -> Item | None:
-        items = declared_items(self._feed)
-        if items:
-            return last_issued(items)
-        return None
+        return self._declared
 
     def revoked(self) -> Item | None:
-        items = revoked_items(self._feed)
-        if items:
-            return last_issued(items)
-        return None
+        return self._revoked
 
     def neither(self) -> bool:
         return not self.declared() and not self.revoked()
@@ -75,3 +97,9 @@ def revoked_items(feed: Feed):
 
 def last_issued(item: list[Item]) -> Item:
     return max(item, key=lambda item: item.bans.issued)
+
+
+def last_issued_or_none(items: list[Item]) -> Item | None:
+    if items:
+        return last_issued(items)
+    return None
@@ -0,0 +1,48 @@
+import os
+import pickle
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from dfes.cache import version_directory
+from dfes.model import TotalFireBans
+from dfes.repository import Repository
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    published: datetime
+    bans: tuple[TotalFireBans, ...]
+
+
+class SnapshotFile:
+    def __init__(self, path: Path):
+        self._path = path
+
+    def read(self) -> Snapshot | None:
+        try:
+            return pickle.loads(self._path.read_bytes())
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+
+    def write(self, snapshot: Snapshot) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self._path.with_suffix(f".{os.getpid()}.tmp")
+        temporary.write_bytes(pickle.dumps(snapshot))
+        temporary.replace(self._path)
+
+    def current(self, repository: Repository) -> Snapshot | None:
+        snapshot = self.read()
+        published = repository.published()
+
+        if snapshot and published and snapshot.published == published[-1]:
+            return snapshot
+        return None
+
+    @property
+    def location(self) -> Path:
+        return self._path
+
+
+def bans_snapshot(repository_directory: Path) -> SnapshotFile:
+    return SnapshotFile(version_directory(repository_directory) / "current.pickle")
@@ -0,0 +1,268 @@
+import os
+import shutil
+from collections.abc import Callable, Collection, Iterable
+from dataclasses import dataclass, replace
+from datetime import datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import polars as pl
+import polars.selectors as cs
+
+from dfes.memo import cached_parse_bans
+from dfes.model import Feed, LOCATIONS, TotalFireBans, entry_key
+
+UTC = pl.Datetime("us", "UTC")
+STORED_TABLES = ("feeds", "entries", "entry_locations", "feed_entries")
+TABLE_NAMES = (*STORED_TABLES, "locations")
+ROW_GROUP_SIZE = 65536
+ENTRY_COLUMNS = ("entry_published", "revoked", "issued", "declared_for")
+WIDE_COLUMNS = ("feed_published", "entry_index", *ENTRY_COLUMNS, "region", "district", "location_code")
+
+
+@dataclass(frozen=True)
+class Tables:
+    feeds: pl.DataFrame
+    entries: pl.DataFrame
+    entry_locations: pl.DataFrame
+    feed_entries: pl.DataFrame
+    locations: pl.DataFrame
+
+    def entry_level(self) -> pl.DataFrame:
+        return self.lazy().entry_level().collect()
+
+    def without_entries(self, known: pl.DataFrame) -> "Tables":
+        return replace(
+            self,
+            entries=self.entries.join(known, on="entry_key", how="anti"),
+            entry_locations=self.entry_locations.join(known, on="entry_key", how="anti"),
+        )
+
+    def write(self, directory: Path, part: int = 0) -> None:
+        for name in STORED_TABLES:
+            (directory / name).mkdir(parents=True, exist_ok=True)
+            temporary = directory / name / f"{part:010d}.{os.getpid()}.tmp"
+            getattr(self, name).write_parquet(temporary, row_group_size=ROW_GROUP_SIZE)
+            temporary.replace(directory / name / f"{part:010d}.parquet")
+
+    @classmethod
+    def read(cls, directory: Path) -> "Tables":
+        tables = {name: pl.read_parquet(parts(directory, name)) for name in STORED_TABLES}
+        return cls(**tables, locations=locations_table())
+
+    @staticmethod
+    def stored(directory: Path) -> bool:
+        return all(list((directory / name).glob("*.parquet")) for name in STORED_TABLES)
+
+    @staticmethod
+    def stored_keys(directory: Path) -> pl.DataFrame:
+        return pl.scan_parquet(parts(directory, "entries")).select("entry_key").collect()
+
+    @staticmethod
+    def remove(directory: Path) -> None:
+        for name in STORED_TABLES:
+            shutil.rmtree(directory / name, ignore_errors=True)
+
+    def wide(self) -> pl.DataFrame:
+        return self.lazy().wide().collect()
+
+    def lazy(self) -> "LazyTables":
+        return LazyTables(**{name: getattr(self, name).lazy() for name in TABLE_NAMES})
+
+
+@dataclass(frozen=True)
+class LazyTables:
+    feeds: pl.LazyFrame
+    entries: pl.LazyFrame
+    entry_locations: pl.LazyFrame
+    feed_entries: pl.LazyFrame
+    locations: pl.LazyFrame
+
+    @classmethod
+    def scan(cls, directory: Path) -> "LazyTables":
+        tables = {name: pl.scan_parquet(parts(directory, name)) for name in STORED_TABLES}
+        return cls(**tables, locations=locations_table().lazy())
+
+    def filtered(self, start: datetime | None = None, end: datetime | None = None,
+                 regions: Collection[str] | None = None,
+                 districts: Collection[str] | None = None) -> "LazyTables":
+        tables = self
+
+        if start or end:
+            in_range = published_between("feed_published", start, end)
+            feed_entries = tables.feed_entries.filter(in_range)
+            tables = replace(
+                tables,
+                feeds=tables.feeds.filter(in_range),
+                feed_entries=feed_entries,
+                entries=tables.entries.join(feed_entries.select("entry_key"), on="entry_key", how="semi"),
+            )
+
+        if regions or districts:
+            locations = tables.locations.filter(matching_locations(regions, districts))
+            codes = locations.select("location_code").collect().to_series().to_list()
+            entry_locations = tables.entry_locations.filter(pl.col("location_code").is_in(codes))
+            matching = entry_locations.select("entry_key")
+            tables = replace(
+                tables,
+                locations=locations,
+                entry_locations=entry_locations,
+                entries=tables.entries.join(matching, on="entry_key", how="semi"),
+                feed_entries=tables.feed_entries.join(matching, on="entry_key", how="semi"),
+            )
+
+        return tables
+
+    def entry_level(self) -> pl.LazyFrame:
+        return self.feed_entries.join(self.entries, on="entry_key", maintain_order="left").drop("entry_key")
+
+    def wide(self) -> pl.LazyFrame:
+        return self.feed_entries.join(
+            self.entries, on="entry_key", maintain_order="left"
+        ).join(
+            self.entry_locations, on="entry_key", maintain_order="left_right"
+        ).join(
+            self.locations, on="location_code", maintain_order="left"
+        ).select(WIDE_COLUMNS)
+
+
+def parts(directory: Path, name: str) -> Path:
+    return directory / name / "*.parquet"
+
+
+def published_between(column: str, start: datetime | None, end: datetime | None) -> pl.Expr:
+    condition = pl.lit(True)
+    if start:
+        condition &= pl.col(column) >= as_perth(start)
+    if end:
+        condition &= pl.col(column) <= as_perth(end)
+    return condition
+
+
+def matching_locations(regions: Collection[str] | None, districts: Collection[str] | None) -> pl.Expr:
+    condition = pl.lit(True)
+    if regions:
+        condition &= pl.col("region").cast(pl.String).is_in(list(regions))
+    if districts:
+        condition &= pl.col("district").cast(pl.String).is_in(list(districts))
+    return condition
+
+
+def as_perth(dt: datetime) -> datetime:
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=ZoneInfo("Australia/Perth"))
+    return dt
+
+
+@dataclass
+class ImportStats:
+    feeds: int = 0
+    entries: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+    peak_bytes: int | None = None
+    table_bytes: int = 0
+
+
+class LocationFilter:
+    def __init__(self, regions: Collection[str] | None = None, districts: Collection[str] | None = None):
+        self._regions = set(regions or ())
+        self._districts = set(districts or ())
+        self._decisions: dict[int, bool] = {}
+
+    def __call__(self, bans: TotalFireBans) -> bool:
+        return any(self._matches(code) for code in bans.locations.codes)
+
+    def _matches(self, code: int) -> bool:
+        if (decision := self._decisions.get(code)) is None:
+            region, district = LOCATIONS.pair(code)
+            decision = self._decisions[code] = (
+                (not self._regions or region in self._regions)
+                and (not self._districts or district in self._districts)
+            )
+        return decision
+
+
+def to_tables(feeds: Iterable[Feed],
+              keep: Callable[[TotalFireBans], bool] | None = None,
+              stats: ImportStats | None = None) -> Tables:
+    stats = stats or ImportStats()
+    feeds_published: list[datetime] = []
+    feed_entries: dict[str, list] = {"feed_published": [], "entry_index": [], "entry_key": []}
+    entries: dict[str, list] = {"entry_key": [], "entry_published": [], "revoked": [], "issued": [], "declared_for": []}
+    entry_locations: dict[str, list] = {"entry_key": [], "location_code": []}
+    seen: set[int] = set()
+    rejected: set[int] = set()
+
+    for feed in feeds:
+        feeds_published.append(feed.published)
+        stats.feeds += 1
+        for index, item in enumerate(feed.items):
+            key = entry_key(item)
+
+            if key in rejected:
+                continue
+
+            if key not in seen:
+                bans = item.bans or cached_parse_bans(item.description)
+                if keep and not keep(bans):
+                    rejected.add(key)
+                    stats.skipped += 1
+                    continue
+
+                seen.add(key)
+                stats.entries += 1
+                entries["entry_key"].append(key)
+                entries["entry_published"].append(item.published)
+                entries["revoked"].append(bans.revoked)
+                entries["issued"].append(bans.issued)
+                entries["declared_for"].append(bans.declared_for)
+                entry_locations["entry_key"].extend([key] * len(bans.locations.codes))
+                entry_locations["location_code"].extend(bans.locations.codes)
+
+            feed_entries["feed_published"].append(feed.published)
+            feed_entries["entry_index"].append(index)
+            feed_entries["entry_key"].append(key)
+
+    return Tables(
+        feeds=in_perth(pl.DataFrame({"feed_published": feeds_published}, schema={"feed_published": UTC})),
+        entries=in_perth(pl.DataFrame(entries, schema={
+            "entry_key": pl.UInt64, "entry_published": UTC, "revoked": pl.Boolean,
+            "issued": UTC, "declared_for": pl.Date,
+        })),
+        entry_locations=pl.DataFrame(entry_locations, schema={"entry_key": pl.UInt64, "location_code": pl.UInt16}),
+        feed_entries=in_perth(pl.DataFrame(feed_entries, schema={
+            "feed_published": UTC, "entry_index": pl.Int64, "entry_key": pl.UInt64,
+        })),
+        locations=locations_table(),
+    )
+
+
+def from_columns(df: pl.DataFrame, published: list[datetime]) -> Tables:
+    feed_entries = df.select("feed_published", "entry_index", "entry_key").unique(
+        ["feed_published", "entry_index"], keep="first", maintain_order=True
+    )
+    first_seen = feed_entries.unique("entry_key", keep="first", maintain_order=True)
+
+    return Tables(
+        feeds=in_perth(pl.DataFrame({"feed_published": published}, schema={"feed_published": UTC})),
+        entries=in_perth(df.unique("entry_key", keep="first", maintain_order=True).select("entry_key", *ENTRY_COLUMNS)),
+        entry_locations=df.join(
+            first_seen, on=["feed_published", "entry_index", "entry_key"], how="semi", maintain_order="left"
+        ).select("entry_key", "location_code"),
+        feed_entries=in_perth(feed_entries),
+        locations=locations_table(),
+    )
+
+
+def locations_table() -> pl.DataFrame:
+    pairs = LOCATIONS.pairs()
+    return pl.DataFrame({
+        "location_code": range(len(pairs)),
+        "region": [region for region, _ in pairs],
+        "district": [district for _, district in pairs],
+    }, schema={"location_code": pl.UInt16, "region": pl.Categorical, "district": pl.Categorical})
+
+
+def in_perth(df: pl.DataFrame) -> pl.DataFrame:
+    return df.with_columns(cs.datetime().dt.convert_time_zone("Australia/Perth"))
@@ -0,0 +1,132 @@
+import bisect
+import json
+import pickle
+from array import array
+from collections.abc import Iterable
+from datetime import datetime
+from pathlib import Path
+
+from dfes.cache import version_directory
+from dfes.date_time import epoch_microseconds
+from dfes.feeds import stored_feeds
+from dfes.model import Feed, TotalFireBans
+from dfes.repository import Repository
+from dfes.show import latest_bans
+
+
+def feed_state(feed: Feed, previous: tuple[TotalFireBans, ...]) -> tuple[TotalFireBans, ...]:
+    try:
+        return latest_bans([feed]) or previous
+    except RuntimeError:
+        return previous
+
+
+class Timeline:
+    def __init__(self, directory: Path):
+        self._directory = directory
+        self._header = directory / "timeline.json"
+        self._times = directory / "times.i64"
+        self._offsets = directory / "offsets.i64"
+        self._states = directory / "states.pickle"
+
+    def exists(self) -> bool:
+        return self._header.exists()
+
+    def last_published(self) -> datetime | None:
+        try:
+            return datetime.fromisoformat(json.loads(self._header.read_text())["last_published"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def current(self, repository: Repository) -> bool:
+        published = repository.published()
+        return self.exists() and bool(published) and self.last_published() == published[-1]
+
+    def at(self, moment: datetime) -> tuple[TotalFireBans, ...]:
+        position = bisect.bisect_right(self.times(), epoch_microseconds(moment)) - 1
+        if position < 0:
+            return tuple()
+        return self._record(self._read_array(self._offsets)[position])
+
+    def times(self) -> array:
+        return self._read_array(self._times)
+
+    def extend(self, feeds: Iterable[Feed]) -> int:
+        if not self.exists():
+            self._clear()
+
+        last = self.last_published()
+        state = self._last_state()
+        times, offsets, records = array("q"), array("q"), []
+        offset = self._states.stat().st_size if self._states.exists() else 0
+
+        for feed in feeds:
+            if last is not None and feed.published <= last:
+                self.invalidate()
+                return 0
+            last = feed.published
+
+            if (bans := feed_state(feed, state)) != state:
+                state = bans
+                record = pickle.dumps(bans)
+                times.append(epoch_microseconds(feed.published))
+                offsets.append(offset)
+                records.append(record)
+                offset += len(record)
+
+        if last is not None:
+            self._append(times, offsets, records, last)
+        return len(records)
+
+    def rebuild(self, feeds: Iterable[Feed]) -> int:
+        self.invalidate()
+        return self.extend(feeds)
+
+    def invalidate(self) -> None:
+        self._header.unlink(missing_ok=True)
+
+    def _clear(self) -> None:
+        for path in (self._header, self._times, self._offsets, self._states):
+            path.unlink(missing_ok=True)
+
+    def _last_state(self) -> tuple[TotalFireBans, ...]:
+        offsets = self._read_array(self._offsets)
+        return self._record(offsets[-1]) if offsets else tuple()
+
+    def _record(self, offset: int) -> tuple[TotalFireBans, ...]:
+        with self._states.open("rb") as f:
+            f.seek(offset)
+            return pickle.load(f)
+
+    def _append(self, times: array, offsets: array, records: list[bytes], last: datetime) -> None:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        with self._states.open("ab") as f:
+            f.writelines(records)
+        with self._offsets.open("ab") as f:
+            f.write(offsets.tobytes())
+        with self._times.open("ab") as f:
+            f.write(times.tobytes())
+        self._header.write_text(json.dumps({"last_published": last.isoformat()}))
+
+    @staticmethod
+    def _read_array(path: Path) -> array:
+        return array("q", path.read_bytes() if path.exists() else b"")
+
+    @property
+    def location(self) -> Path:
+        return self._directory
+
+
+def advance_timeline(timeline: Timeline, feed: Feed, published: list[datetime]) -> None:
+    if published and timeline.last_published() == published[-1]:
+        timeline.extend([feed])
+
+
+def bans_timeline(repository_directory: Path) -> Timeline:
+    return Timeline(version_directory(repository_directory) / "timeline")
+
+
+def bans_at(repository: Repository, timeline: Timeline, moment: datetime) -> tuple[TotalFireBans, ...]:
+    if not timeline.current(repository):
+        timeline.rebuild(stored_feeds(repository))
+    return timeline.at(moment)
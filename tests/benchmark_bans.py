@@ -0,0 +1,38 @@
+import timeit
+from datetime import datetime, date
+from zoneinfo import ZoneInfo
+
+from dfes.bans import BACKENDS
+from dfes.model import AffectedAreas, TotalFireBans
+from generate import render_bans_as_html
+
+
+def description() -> str:
+    return render_bans_as_html(
+        TotalFireBans(
+            revoked=False,
+            issued=datetime(2023, 10, 15, 17, 6, tzinfo=ZoneInfo(key='Australia/Perth')),
+            declared_for=date(2023, 10, 16),
+            locations=AffectedAreas(
+                [("Midwest Gascoyne", f"District {n}") for n in range(20)] +
+                [("Perth Metropolitan", f"District {n}") for n in range(20)]
+            ),
+        )
+    )
+
+
+def per_description(parse, html: str, number: int = 500) -> float:
+    return min(timeit.repeat(lambda: parse(html), number=number, repeat=5)) / number
+
+
+def main():
+    html = description()
+    timings = {name: per_description(parse, html) for name, parse in BACKENDS.items()}
+    slowest = max(timings.values())
+
+    for name, seconds in timings.items():
+        print(f"{name:12} {seconds * 1e6:8.1f} us/description  {slowest / seconds:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
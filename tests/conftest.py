@@ -1,7 +1,7 @@
 import pytest
 from bs4 import BeautifulSoup
 
-from dfes.repository import InMemoryRepository, FileRepository
+from dfes.repository import InMemoryRepository, FileRepository, SqliteRepository, ContentRepository
 from generate import render_feed_as_rss, create_feed
 
 
@@ -9,17 +9,19 @@ from generate import render_feed_as_rss, create_feed
 def bad_description() -> str:
     feed = create_feed()
     feed_xml = render_feed_as_rss(feed)
-    soup = BeautifulSoup(feed_xml)
+    soup = BeautifulSoup(feed_xml, features="html.parser")
     tag = soup.find(name="description")
     tag.string = "This will not parse"
     return str(soup)
 
 
-@pytest.fixture(params=["in_memory", "file_system"])
+@pytest.fixture(params=["in_memory", "file_system", "sqlite", "content"])
 def repository(request, tmp_path):
     repositories = {
-        "in_memory": InMemoryRepository(),
-        "file_system": FileRepository(tmp_path),
+        "in_memory": InMemoryRepository,
+        "file_system": lambda: FileRepository(tmp_path),
+        "sqlite": lambda: SqliteRepository(tmp_path),
+        "content": lambda: ContentRepository(tmp_path),
     }
 
-    return repositories[request.param]
+    return repositories[request.param]()
@@ -4,8 +4,9 @@ from zoneinfo import ZoneInfo
 import polars as pl
 import pytest
 
-from dfes.analyze import n_entries, issued_to_declared, format_datetime, col_interval_minutes, \
+from dfes.analyze import to_dataframe, locations_mask, n_entries, issued_to_declared, format_datetime, col_interval_minutes, \
     datetime_to_hour, perth_tz
+from dfes.model import AffectedAreas, Feed, Item, TotalFireBans
 
 
 def test_issued_to_declared():
@@ -102,3 +103,22 @@ def test_perth_tz():
     )
 
     assert df["dt"].to_list()[0] == out_time
+
+
+def test_dataframe_exports_location_codes():
+    areas = AffectedAreas([("Pilbara", "Exmouth"), ("Pilbara", "Ashburton")])
+    bans = TotalFireBans(
+        issued=datetime(2000, 1, 1, tzinfo=timezone.utc),
+        declared_for=date(2000, 1, 2),
+        locations=areas,
+    )
+    feed = Feed(
+        title="T",
+        published=datetime(2000, 1, 1, tzinfo=timezone.utc),
+        items=[Item(published=datetime(2000, 1, 1, tzinfo=timezone.utc), description="", bans=bans)],
+    )
+
+    df = to_dataframe([feed])
+
+    assert df.get_column("location_code").to_list() == list(areas.codes)
+    assert locations_mask(df.get_column("location_code")) == areas.mask
@@ -0,0 +1,166 @@
+from dataclasses import replace
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+from click.testing import CliRunner
+
+from dfes import ban_calendar as ban_calendar_module, commands
+from dfes.ban_calendar import DECLARED, DEFAULT_WIDTH, REVOKED, BanCalendar, ban_calendar
+from dfes.fetch import store_feed
+from dfes.migrate import rebuild_calendar
+from dfes.model import LOCATIONS, AffectedAreas, Feed, Item, TotalFireBans
+from dfes.repository import FileRepository
+from generate import create_feed, render_bans_as_html, render_feed_as_rss
+
+ALBANY = ("Great Southern", "Albany")
+EXMOUTH = ("Midwest Gascoyne", "Exmouth")
+
+
+def item(issued: datetime, declared_for: date, pairs, revoked: bool = False) -> Item:
+    bans = TotalFireBans(
+        issued=issued.replace(tzinfo=ZoneInfo("Australia/Perth")),
+        declared_for=declared_for,
+        locations=AffectedAreas(pairs),
+        revoked=revoked,
+    )
+    return Item(published=issued, description=render_bans_as_html(bans), bans=bans)
+
+
+def feed(*items: Item) -> Feed:
+    return Feed(title="Total Fire Ban (All Regions)", published=max(item.published for item in items), items=list(items))
+
+
+@pytest.fixture
+def feeds():
+    return [
+        feed(item(datetime(2023, 12, 1, 16), date(2023, 12, 2), [ALBANY, EXMOUTH])),
+        feed(
+            item(datetime(2023, 12, 1, 16), date(2023, 12, 2), [ALBANY, EXMOUTH]),
+            item(datetime(2023, 12, 2, 7), date(2023, 12, 2), [EXMOUTH], revoked=True),
+        ),
+        feed(item(datetime(2023, 12, 4, 16), date(2023, 12, 5), [ALBANY])),
+    ]
+
+
+@pytest.fixture
+def calendar(tmp_path, feeds):
+    calendar = BanCalendar(tmp_path / "calendar")
+    calendar.rebuild(feeds)
+    return calendar
+
+
+def code(pair) -> int:
+    return LOCATIONS.find(*pair)
+
+
+class TestBanCalendar:
+    def test_days_span_declared_dates(self, calendar):
+        assert calendar.days() == [date(2023, 12, 2), date(2023, 12, 3), date(2023, 12, 4), date(2023, 12, 5)]
+
+    def test_dates_for_district(self, calendar):
+        assert calendar.dates(code(ALBANY)) == [date(2023, 12, 2), date(2023, 12, 5)]
+
+    def test_later_revocation_wins(self, calendar):
+        assert calendar.dates(code(EXMOUTH)) == []
+        assert calendar.dates(code(EXMOUTH), REVOKED) == [date(2023, 12, 2)]
+
+    def test_rebuild_allocates_once(self, tmp_path, feeds, monkeypatch):
+        calls = []
+        reshape = ban_calendar_module.reshaped
+        monkeypatch.setattr(ban_calendar_module, "reshaped", lambda *args: calls.append(1) or reshape(*args))
+        BanCalendar(tmp_path / "again").rebuild(feeds)
+        assert calls == [1]
+
+    def test_earlier_issue_does_not_override(self, calendar, feeds):
+        calendar.update([feeds[0]])
+        assert calendar.codes(date(2023, 12, 2), REVOKED) == [code(EXMOUTH)]
+
+    def test_count_within_range(self, calendar):
+        assert calendar.count(code(ALBANY)) == 2
+        assert calendar.count(code(ALBANY), start=date(2023, 12, 3)) == 1
+        assert calendar.count(code(ALBANY), end=date(2023, 12, 4)) == 1
+        assert calendar.count(code(ALBANY), start=date(2024, 1, 1)) == 0
+
+    def test_codes_for_day(self, calendar):
+        assert calendar.codes(date(2023, 12, 2), DECLARED) == [code(ALBANY)]
+        assert calendar.codes(date(2023, 11, 30)) == []
+
+    def test_update_grows_both_ends(self, calendar):
+        calendar.update([feed(item(datetime(2023, 11, 28, 16), date(2023, 11, 29), [ALBANY]))])
+        calendar.update([feed(item(datetime(2023, 12, 9, 16), date(2023, 12, 10), [ALBANY]))])
+        assert calendar.dates(code(ALBANY)) == [
+            date(2023, 11, 29), date(2023, 12, 2), date(2023, 12, 5), date(2023, 12, 10)
+        ]
+
+    def test_update_widens_for_new_codes(self, calendar):
+        widened = item(datetime(2023, 12, 2, 16), date(2023, 12, 3), [ALBANY])
+        widened.bans = replace(widened.bans, locations=AffectedAreas.from_codes([code(ALBANY), DEFAULT_WIDTH]))
+        calendar.update([feed(widened)])
+        assert calendar.shape().width == 2 * DEFAULT_WIDTH
+        assert calendar.dates(DEFAULT_WIDTH) == [date(2023, 12, 3)]
+        assert calendar.dates(code(ALBANY)) == [date(2023, 12, 2), date(2023, 12, 3), date(2023, 12, 5)]
+
+    def test_empty_calendar(self, tmp_path):
+        calendar = BanCalendar(tmp_path / "calendar")
+        assert calendar.rebuild([]) == 0
+        assert calendar.days() == []
+        assert calendar.count(0) == 0
+
+
+@pytest.fixture
+def repository(tmp_path, feeds):
+    repository = FileRepository(tmp_path / "repository")
+    for f in feeds:
+        store_feed(render_feed_as_rss(f), repository)
+    return repository
+
+
+def test_rebuild_from_repository(repository, calendar):
+    rebuilt = ban_calendar(repository.location)
+    rebuild_calendar(repository, rebuilt, workers=1)
+    assert rebuilt.dates(code(ALBANY)) == calendar.dates(code(ALBANY))
+
+
+def test_fetch_updates_existing_calendar(repository):
+    calendar = ban_calendar(repository.location)
+    rebuild_calendar(repository, calendar, workers=1)
+
+    latest = create_feed(datetime(2023, 12, 8, tzinfo=timezone.utc), 1)
+    store_feed(render_feed_as_rss(latest), repository, calendar=calendar)
+
+    assert calendar.dates(code(("A Region", "A District"))) == [date(2023, 12, 8)]
+
+
+def test_fetch_skips_missing_calendar(repository):
+    calendar = ban_calendar(repository.location)
+    store_feed(render_feed_as_rss(create_feed(datetime(2023, 12, 8, tzinfo=timezone.utc), 1)), repository,
+               calendar=calendar)
+    assert not calendar.exists()
+
+
+class TestCommands:
+    @pytest.fixture
+    def invoke(self, repository, monkeypatch):
+        monkeypatch.setattr(commands, "open_repository", lambda backend: repository)
+        return lambda *args: CliRunner().invoke(commands.dfes, args, catch_exceptions=False)
+
+    def test_calendar_for_district(self, invoke):
+        result = invoke("calendar", "--district", "Albany")
+        assert result.output.splitlines() == [
+            "2023-12-02  Great Southern / Albany",
+            "2023-12-05  Great Southern / Albany",
+        ]
+
+    def test_calendar_by_day(self, invoke):
+        result = invoke("calendar", "--end", "2023-12-03")
+        assert result.output.splitlines() == [
+            "2023-12-02  Albany",
+            "2023-12-02  revoked: Exmouth",
+        ]
+
+    def test_unknown_district(self, invoke):
+        assert invoke("calendar", "--district", "Nowhere").exit_code != 0
+
+    def test_stats(self, invoke):
+        assert invoke("stats").output.splitlines() == ["    2  Great Southern / Albany"]
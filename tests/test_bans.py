@@ -153,7 +153,12 @@ def test_extract_region():
     assert bans.extract_region(tag) == "Midwest Gascoyne"
 
 
-def test_combined_data():
+@pytest.fixture(params=list(bans.BACKENDS))
+def backend(request) -> str:
+    return request.param
+
+
+def test_combined_data(backend):
     description = render_bans_as_html(
         TotalFireBans(
             revoked=False,
@@ -168,7 +173,7 @@ def test_combined_data():
         )
     )
 
-    combined = bans.parse_bans(description)
+    combined = bans.parse_bans(description, backend)
 
     assert combined.issued == datetime(2023, 10, 15, 17, 6, tzinfo=ZoneInfo(key='Australia/Perth'))
     assert combined.declared_for == date(2023, 10, 16)
@@ -180,6 +185,60 @@ def test_combined_data():
     ]
 
 
+def test_revoked_data(backend):
+    revoked = TotalFireBans(
+        revoked=True,
+        issued=datetime(2023, 12, 10, 9, 15, tzinfo=ZoneInfo(key='Australia/Perth')),
+        declared_for=date(2023, 12, 10),
+        locations=AffectedAreas([('Perth Metropolitan', 'Armadale')]),
+    )
+
+    assert bans.parse_bans(render_bans_as_html(revoked), backend) == revoked
+
+
+def test_district_with_real_whitespace(backend):
+    html = """
+    <div>
+    <p><br /><span style="color: #777777;">Time of issue: 05:05 PM </span>
+    <br /><span style="color: #777777;">Date of issue: 02 January 2023 </span></p>
+    <p>A Total Fire Ban has been declared for 3 January 2023 for the local government districts listed below:</p>
+    <p><strong>Midwest Gascoyne Region:</strong> 	
+    </p>
+    <ul>
+    <li>Carnamah - All Day</li>   
+    <li>Chapman Valley - All Day</li> 
+    </ul>
+    </div>
+    """
+
+    parsed = bans.parse_bans(html, backend)
+
+    assert parsed.issued == datetime(2023, 1, 2, 17, 5, tzinfo=ZoneInfo(key='Australia/Perth'))
+    assert parsed.declared_for == date(2023, 1, 3)
+    assert parsed.locations.pairs == [
+        ("Midwest Gascoyne", "Carnamah"),
+        ("Midwest Gascoyne", "Chapman Valley"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "html,message",
+    [
+        ("This will not parse", "No <span> tag found"),
+        ("<p>not a span</p>", "No <span> tag found"),
+        ("<span>Time of issue: 05:05 PM</span><span>Date of issue: 02 January 2023</span>",
+         "Neither declared for nor revoked tag found"),
+    ]
+)
+def test_parse_failures(backend, html, message):
+    with pytest.raises(ParsingFailed, match=message):
+        bans.parse_bans(html, backend)
+
+
+def test_default_backend_is_available():
+    assert bans.DEFAULT_BACKEND in bans.BACKENDS
+
+
 class TestAffectedAreas:
     def test_to_dict(self):
         areas = AffectedAreas(
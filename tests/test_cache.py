@@ -0,0 +1,77 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from dfes.cache import FeedCache, feed_cache, cache_directory, version_directory, content_hash
+from dfes.feeds import parse_feeds, parse_feed_and_bans
+from dfes.fetch import store_feed
+from dfes.model import Feed
+from dfes.repository import FileRepository
+from generate import render_feed_as_rss, create_feed
+
+
+@pytest.fixture
+def cache(tmp_path) -> FeedCache:
+    return feed_cache(tmp_path)
+
+
+def test_should_miss_when_empty(cache):
+    assert cache.get("Never stored") is None
+
+
+def test_should_retrieve_stored_feed(cache):
+    feed = create_feed()
+    rss = render_feed_as_rss(feed)
+    cache.put(rss, feed)
+    assert cache.get(rss) == feed
+
+
+def test_should_key_by_content(cache):
+    feed = create_feed()
+    cache.put("First", feed)
+    assert cache.get("Second") is None
+
+
+def test_content_hash_is_stable():
+    assert content_hash("feed") == content_hash("feed")
+    assert content_hash("feed") != content_hash("other feed")
+
+
+def test_should_remove_stale_parser_versions(tmp_path):
+    stale = cache_directory(tmp_path) / "parser_v0"
+    stale.mkdir(parents=True)
+    feed_cache(tmp_path)
+    assert not stale.exists()
+    assert version_directory(tmp_path).exists()
+
+
+def test_should_parse_bans_on_miss(cache):
+    feed = create_feed()
+    rss = render_feed_as_rss(feed)
+    assert parse_feed_and_bans(rss, cache) == feed
+    assert cache.get(rss) == feed
+
+
+def test_should_not_parse_on_hit(cache):
+    cached = Feed(
+        title="Cached",
+        published=datetime(2000, 1, 1, tzinfo=timezone.utc),
+        items=[]
+    )
+    cache.put("Not a feed", cached)
+    assert list(parse_feeds(["Not a feed"], cache)) == [cached]
+
+
+def test_should_fill_cache_on_fetch(tmp_path, cache):
+    feed = create_feed()
+    rss = render_feed_as_rss(feed)
+    store_feed(rss, FileRepository(tmp_path), cache=cache)
+    assert cache.get(rss) == feed
+
+
+def test_should_not_list_cache_as_feeds(tmp_path, cache):
+    feed = create_feed()
+    rss = render_feed_as_rss(feed)
+    repository = FileRepository(tmp_path)
+    store_feed(rss, repository, cache=cache)
+    assert repository.published() == [feed.published]
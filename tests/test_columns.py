@@ -0,0 +1,112 @@
+from datetime import datetime, timezone
+
+import polars as pl
+import pytest
+
+from dfes.analyze import import_column_store, import_repository, to_dataframe
+from dfes.cache import PARSER_VERSION
+from dfes.columns import ColumnStore, column_store, record_batches
+from dfes.fetch import store_feed
+from dfes.migrate import rebuild_column_store
+from dfes.repository import FileRepository
+from generate import create_feed, render_feed_as_rss
+
+
+@pytest.fixture
+def feeds():
+    return [
+        create_feed(datetime(2023, 1, 30, tzinfo=timezone.utc), 2),
+        create_feed(datetime(2023, 2, 2, tzinfo=timezone.utc), 1),
+    ]
+
+
+@pytest.fixture
+def repository(tmp_path, feeds):
+    repository = FileRepository(tmp_path)
+    for feed in feeds:
+        store_feed(render_feed_as_rss(feed), repository)
+    return repository
+
+
+def test_rebuild_partitions_by_month(tmp_path, feeds):
+    store = ColumnStore(tmp_path / "columns")
+    assert store.rebuild(feeds) == 2
+    assert [path.parent.name for path in store.files()] == ["month=2023-01", "month=2023-02"]
+    assert store.current()
+
+
+def test_store_loads_as_dataframe(tmp_path, feeds):
+    store = ColumnStore(tmp_path / "columns")
+    store.rebuild(feeds)
+    assert import_column_store(store).equals(to_dataframe(feeds))
+
+
+def test_rebuild_from_repository(repository, feeds):
+    store = column_store(repository.location)
+    assert rebuild_column_store(repository, store, workers=1) == 2
+    assert import_repository(repository.location).equals(to_dataframe(feeds))
+
+
+def test_fetch_appends_to_current_store(repository, feeds):
+    store = column_store(repository.location)
+    rebuild_column_store(repository, store, workers=1)
+
+    latest = create_feed(datetime(2023, 2, 3, tzinfo=timezone.utc), 1)
+    store_feed(render_feed_as_rss(latest), repository, columns=store)
+
+    assert len(store.files()) == 3
+    assert import_column_store(store).equals(to_dataframe(feeds + [latest]))
+
+
+def test_first_fetch_creates_store(tmp_path, feeds):
+    repository = FileRepository(tmp_path)
+    store = column_store(repository.location)
+    for feed in feeds:
+        store_feed(render_feed_as_rss(feed), repository, columns=store)
+
+    assert store.covers(repository.published())
+    assert import_column_store(store).equals(to_dataframe(feeds))
+
+
+def test_refetched_feed_is_counted_once(tmp_path, feeds):
+    repository = FileRepository(tmp_path)
+    store = column_store(repository.location)
+    changed = create_feed(feeds[0].published, 1)
+    store_feed(render_feed_as_rss(feeds[0]), repository, columns=store)
+    store_feed(render_feed_as_rss(changed), repository, columns=store)
+
+    assert store.n_feeds() == 1
+    assert store.covers(repository.published())
+    assert import_column_store(store).equals(to_dataframe([changed]))
+
+
+def test_store_started_late_does_not_cover(repository, feeds):
+    store = column_store(repository.location)
+    latest = create_feed(datetime(2023, 2, 3, tzinfo=timezone.utc), 1)
+    store_feed(render_feed_as_rss(latest), repository, columns=store)
+
+    assert len(store.files()) == 1
+    assert not store.covers(repository.published())
+    assert import_repository(repository.location).equals(to_dataframe(feeds + [latest]))
+
+
+def test_parser_change_makes_store_stale(tmp_path, feeds):
+    store = ColumnStore(tmp_path / "columns")
+    store.rebuild(feeds)
+    (store.location / "VERSION").write_text(str(PARSER_VERSION - 1))
+    assert not store.current()
+
+
+def test_batches_stream_by_feed_count(feeds):
+    batches = list(record_batches(feeds, batch_feeds=1))
+    assert [batch.num_rows for batch in batches] == [2, 1]
+
+
+def test_locations_are_dictionary_encoded(feeds):
+    df = to_dataframe(feeds)
+    assert df.schema["region"] == pl.Categorical
+    assert df.get_column("district").cast(pl.String).to_list() == ["A District"] * 3
+
+
+def test_empty_feeds_give_empty_frame():
+    assert to_dataframe([]).columns == to_dataframe([create_feed(n_items=1)]).columns
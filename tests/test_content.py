@@ -0,0 +1,65 @@
+from dataclasses import replace
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+from dfes.content import split_stamp, join_stamp, BlobStore, PLACEHOLDER
+from dfes.repository import ContentRepository
+from generate import create_feed, render_feed_as_rss
+
+
+@pytest.mark.parametrize(
+    "feed_text",
+    [
+        "<rss><channel><pubDate>Mon, 01 Jan 2024 00:00:00 GMT</pubDate></channel></rss>",
+        "<rss><channel></channel></rss>",
+        f"Contains a {PLACEHOLDER} already <pubDate>x</pubDate>",
+    ]
+)
+def test_split_and_join_round_trip(feed_text):
+    assert join_stamp(*split_stamp(feed_text)) == feed_text
+
+
+def test_split_removes_first_pub_date():
+    body, stamp = split_stamp("<pubDate>first</pubDate><pubDate>second</pubDate>")
+    assert stamp == "first"
+    assert "first" not in body
+    assert "second" in body
+
+
+def test_blob_store_round_trip(tmp_path):
+    blobs = BlobStore(tmp_path)
+    key = blobs.put("Bans for January 3rd")
+    assert blobs.get(key) == "Bans for January 3rd"
+
+
+def test_blob_store_deduplicates(tmp_path):
+    blobs = BlobStore(tmp_path)
+    assert blobs.put("Same") == blobs.put("Same")
+    assert len(blobs.keys()) == 1
+
+
+def republished(published: datetime) -> str:
+    feed = create_feed(datetime(2000, 1, 2, tzinfo=timezone.utc), 2)
+    return render_feed_as_rss(replace(feed, published=published))
+
+
+def test_should_share_content_between_republished_feeds(tmp_path):
+    first = datetime(2000, 1, 2, tzinfo=timezone.utc)
+    second = first + timedelta(minutes=5)
+
+    repository = ContentRepository(tmp_path)
+    repository.add_bans(first, republished(first))
+    repository.add_bans(second, republished(second))
+
+    assert repository.content_key(first) == repository.content_key(second)
+    assert len(BlobStore(tmp_path / "content" / "blobs").keys()) == 1
+    assert repository.retrieve_bans(second) == republished(second)
+
+
+def test_should_reload_timeline_written_elsewhere(tmp_path):
+    published = datetime(2000, 1, 2, tzinfo=timezone.utc)
+    reader = ContentRepository(tmp_path)
+    assert reader.published() == []
+    ContentRepository(tmp_path).add_bans(published, republished(published))
+    assert reader.published() == [published]
@@ -0,0 +1,64 @@
+from dataclasses import replace
+from datetime import datetime, date
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from dfes import bans
+from dfes.extract import extract
+from dfes.model import AffectedAreas, TotalFireBans
+from generate import render_bans_as_html, create_items
+
+
+@pytest.fixture
+def declared() -> TotalFireBans:
+    return TotalFireBans(
+        revoked=False,
+        issued=datetime(2023, 10, 15, 17, 6, tzinfo=ZoneInfo(key='Australia/Perth')),
+        declared_for=date(2023, 10, 16),
+        locations=AffectedAreas([
+            ('Midwest Gascoyne', 'Carnamah'),
+            ('Midwest Gascoyne', 'Chapman Valley'),
+            ('Perth Metropolitan', 'Armadale')
+        ]),
+    )
+
+
+def test_should_extract_template(declared):
+    assert extract(render_bans_as_html(declared)) == declared
+
+
+def test_should_extract_revoked(declared):
+    revoked = replace(declared, revoked=True)
+    assert extract(render_bans_as_html(revoked)) == revoked
+
+
+def test_should_match_dom_parser_on_generated_items():
+    for item in create_items(datetime(2023, 1, 1, 5, 30, tzinfo=ZoneInfo("Australia/Perth")), 30):
+        assert extract(item.description) == bans.parse_bans_soup(item.description)
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        "This will not parse",
+        "<p><strong>Perth &amp; Hills Region:</strong></p><ul><li>Armadale</li></ul>",
+        "<p><strong>Perth Region:</strong></p><ul><li><b>Armadale</b></li></ul>",
+        "<p><strong>Perth Region:</strong></p><p><strong>Hills Region:</strong></p><ul><li>Armadale</li></ul>",
+        "<P>A Total Fire Ban has been declared for 3 January 2023</P>",
+    ]
+)
+def test_should_not_extract_deviations(html):
+    assert extract(html) is None
+
+
+def test_should_count_extractions_and_fallbacks(declared):
+    html = render_bans_as_html(declared)
+    deviating = html.replace("Armadale", "Armadale &amp; Kelmscott")
+    before = bans.EXTRACTOR_COUNTS.copy()
+
+    assert bans.parse_bans_template(html) == declared
+    assert bans.parse_bans_template(deviating).locations.pairs[-1] == ('Perth Metropolitan', 'Armadale & Kelmscott')
+
+    assert bans.EXTRACTOR_COUNTS["extracted"] == before["extracted"] + 1
+    assert bans.EXTRACTOR_COUNTS["fallback"] == before["fallback"] + 1
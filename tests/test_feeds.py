@@ -3,8 +3,8 @@ from datetime import datetime, timezone
 import pytest
 
 from dfes.exceptions import ParsingFailed
-from dfes.feeds import parse_feed
-from dfes.model import Feed
+from dfes.feeds import parse_feed, parse_feeds_parallel
+from dfes.model import Feed, Item
 from generate import render_feed_as_rss, create_feed
 
 
@@ -36,3 +36,62 @@ def test_parse_item():
     parsed = parse_feed(rss)
     assert parsed.items[0].published == datetime(2000, 1, 1, 0, 0, tzinfo=timezone.utc)
     assert parsed.items[0].description.startswith("<div>")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parse_in_parallel(workers):
+    feeds = [create_feed(datetime(2000, 1, day, tzinfo=timezone.utc), 2) for day in range(2, 30)]
+    feeds_text = [render_feed_as_rss(feed) for feed in feeds]
+    assert list(parse_feeds_parallel(feeds_text, workers, chunksize=2)) == feeds
+
+
+def test_parallel_failure_does_not_abort():
+    feeds = [create_feed(datetime(2000, 1, day, tzinfo=timezone.utc), 1) for day in range(2, 4)]
+    feeds_text = [render_feed_as_rss(feeds[0]), "Not the expected xml string", render_feed_as_rss(feeds[1])]
+
+    results = list(parse_feeds_parallel(feeds_text, workers=2))
+
+    assert results[0] == feeds[0]
+    assert isinstance(results[1], ParsingFailed)
+    assert results[2] == feeds[1]
+
+
+def test_lazy_bans_parsed_on_first_access():
+    calls = []
+    item = Item(
+        published=datetime(2000, 1, 1, tzinfo=timezone.utc),
+        description="Description",
+        parse=lambda description: calls.append(description) or "Parsed",
+    )
+
+    assert not calls
+    assert item.bans == "Parsed"
+    assert item.bans == "Parsed"
+    assert calls == ["Description"]
+
+
+def test_parse_feed_with_lazy_bans():
+    feed = create_feed()
+    parsed = parse_feed(render_feed_as_rss(feed), bans="lazy")
+    assert parsed.items[0].bans == feed.items[0].bans
+
+
+def test_parse_feed_without_bans():
+    parsed = parse_feed(render_feed_as_rss(create_feed()), bans="none")
+    assert parsed.items[0].bans is None
+
+
+def test_eager_bans_fail_at_parse(bad_description):
+    with pytest.raises(ParsingFailed):
+        parse_feed(bad_description, bans="eager")
+
+
+def test_lazy_bans_fail_at_first_access(bad_description):
+    parsed = parse_feed(bad_description, bans="lazy")
+    with pytest.raises(ParsingFailed):
+        _ = parsed.items[0].bans
+
+
+def test_unknown_bans_mode():
+    with pytest.raises(ValueError):
+        parse_feed(render_feed_as_rss(create_feed()), bans="sometimes")
@@ -1,11 +1,9 @@
-from datetime import datetime, timezone
+from dataclasses import replace
+from datetime import datetime, timezone, timedelta
 
-import pytest
 import responses
 
-from dfes.exceptions import ParsingFailed
-from dfes.feeds import parse_feed
-from dfes.fetch import store_feed, aquire_ban_feed, check_description, store_failed
+from dfes.fetch import store_feed, aquire_ban_feed, store_failed, already_stored
 from dfes.repository import FailedByFetched
 from dfes.urls import FIRE_BAN_URL
 from generate import render_feed_as_rss, create_feed
@@ -76,19 +74,6 @@ def test_should_not_store_failed_feed_twice(repository):
     assert repository.list_failed() == [first_timestamp]
 
 
-def test_should_raise_exception_checking_bad_description(bad_description):
-    feed = parse_feed(bad_description)
-    with pytest.raises(ParsingFailed):
-        check_description(feed)
-
-
-def test_should_not_raise_exception_when_description_ok():
-    feed = create_feed()
-    rss = render_feed_as_rss(feed)
-    feed = parse_feed(rss)
-    check_description(feed)
-
-
 def test_should_store_bad_description_in_failed(bad_description, repository):
     now = datetime(2023, 10, 15, 8, 8, tzinfo=timezone.utc)
     store_feed(bad_description, repository, now)
@@ -124,3 +109,17 @@ def test_should_store_when_different_to_last_feed(repository):
     repository.add_failed("Add me", now=datetime(2001, 1, 1))
     assert len(failed) == 1
     assert store_failed(repository, "Add me too")
+
+
+def test_should_skip_feed_already_stored(repository):
+    rss = render_feed_as_rss(create_feed())
+    store_feed(rss, repository)
+    assert already_stored(rss, repository)
+
+
+def test_should_not_skip_changed_feed(repository):
+    feed = create_feed()
+    store_feed(render_feed_as_rss(feed), repository)
+    bans = feed.items[0].bans
+    feed.items[0].bans = replace(bans, declared_for=bans.declared_for + timedelta(days=1))
+    assert not already_stored(render_feed_as_rss(feed), repository)
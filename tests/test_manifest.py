@@ -0,0 +1,122 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from dfes.manifest import Manifest, ManifestEntry, to_line, from_line, latest_by_published, directory_mtime
+from dfes.repository import FileRepository, to_bans_file_name
+
+
+@pytest.fixture
+def entry() -> ManifestEntry:
+    return ManifestEntry(
+        published=datetime(2023, 10, 15, 4, 8, 11, tzinfo=timezone.utc),
+        file_name="bans_issued_2023_10_15_040811.rss",
+        size=20,
+        content_hash="abc123",
+    )
+
+
+def test_line_round_trip(entry):
+    assert from_line(to_line(entry)) == entry
+
+
+def test_latest_entry_wins(entry):
+    replaced = ManifestEntry(entry.published, entry.file_name, 30, "def456")
+    assert latest_by_published([entry, replaced]) == [replaced]
+
+
+def test_should_record_added_bans(tmp_path):
+    published = datetime(2023, 1, 2, 5, 5, tzinfo=timezone.utc)
+    repository = FileRepository(tmp_path)
+    repository.add_bans(published, "Bans for January 3rd")
+    manifest = (tmp_path / "index" / "manifest.tsv").read_text()
+    assert to_bans_file_name(published) in manifest
+
+
+def test_should_sort_out_of_order_additions(tmp_path):
+    later = datetime(2023, 1, 3, 5, 5, tzinfo=timezone.utc)
+    earlier = datetime(2023, 1, 2, 5, 5, tzinfo=timezone.utc)
+    repository = FileRepository(tmp_path)
+    repository.add_bans(later, "Bans for January 4th")
+    repository.add_bans(earlier, "Bans for January 3rd")
+    assert repository.published() == [earlier, later]
+
+
+def test_should_rebuild_when_file_added_outside_repository(tmp_path):
+    published = datetime(2023, 1, 2, 5, 5, tzinfo=timezone.utc)
+    repository = FileRepository(tmp_path)
+    assert repository.published() == []
+    (tmp_path / to_bans_file_name(published)).write_text("Bans for January 3rd")
+    assert repository.published() == [published]
+    assert repository.retrieve_bans(published) == "Bans for January 3rd"
+
+
+def test_should_rebuild_when_file_removed_outside_repository(tmp_path):
+    published = datetime(2023, 1, 2, 5, 5, tzinfo=timezone.utc)
+    repository = FileRepository(tmp_path)
+    repository.add_bans(published, "Bans for January 3rd")
+    (tmp_path / to_bans_file_name(published)).unlink()
+    assert repository.published() == []
+
+
+def test_should_rebuild_when_manifest_missing(tmp_path):
+    published = datetime(2023, 1, 2, 5, 5, tzinfo=timezone.utc)
+    FileRepository(tmp_path).add_bans(published, "Bans for January 3rd")
+    (tmp_path / "index" / "manifest.tsv").unlink()
+    (tmp_path / "index" / "manifest.stamp").unlink()
+    assert FileRepository(tmp_path).published() == [published]
+
+
+def test_should_stay_in_sync_after_adding_failed(tmp_path):
+    repository = FileRepository(tmp_path)
+    repository.add_bans(datetime(2023, 1, 2, 5, 5, tzinfo=timezone.utc), "Bans for January 3rd")
+    repository.add_failed("unparseable", now=datetime(2023, 1, 2, 6, 0))
+    stamp = (tmp_path / "index" / "manifest.stamp").read_text()
+    assert int(stamp) == directory_mtime(tmp_path)
+
+
+@pytest.fixture
+def rebuilds(monkeypatch):
+    calls = []
+    rebuild = Manifest.rebuild
+    monkeypatch.setattr(Manifest, "rebuild", lambda self: calls.append(1) or rebuild(self))
+    return calls
+
+
+def test_adding_bans_does_not_scan(tmp_path, monkeypatch):
+    scans = []
+    file_names = FileRepository._bans_file_names
+    monkeypatch.setattr(FileRepository, "_bans_file_names", lambda self: scans.append(1) or file_names(self))
+    repository = FileRepository(tmp_path)
+    repository.published()
+    scans.clear()
+
+    for day in range(2, 5):
+        repository.add_bans(datetime(2023, 1, day, 5, 5, tzinfo=timezone.utc), "Bans")
+    repository.add_failed("unparseable", now=datetime(2023, 1, 5, 6, 0))
+
+    assert scans == []
+
+
+@pytest.mark.parametrize("create", [
+    lambda directory: (directory / "columns").mkdir(),
+    lambda directory: (directory / "locations.tsv").write_text("1\tPerth\n"),
+])
+def test_unrelated_files_do_not_rebuild(tmp_path, rebuilds, create):
+    published = datetime(2023, 1, 2, 5, 5, tzinfo=timezone.utc)
+    repository = FileRepository(tmp_path)
+    repository.add_bans(published, "Bans for January 3rd")
+    rebuilds.clear()
+    create(tmp_path)
+    assert repository.published() == [published]
+    assert rebuilds == []
+
+
+def test_added_bans_file_rebuilds(tmp_path, rebuilds):
+    published = datetime(2023, 1, 2, 5, 5, tzinfo=timezone.utc)
+    repository = FileRepository(tmp_path)
+    repository.published()
+    rebuilds.clear()
+    (tmp_path / to_bans_file_name(published)).write_text("Bans for January 3rd")
+    assert repository.published() == [published]
+    assert rebuilds == [1]
@@ -0,0 +1,63 @@
+from datetime import datetime, date
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from dfes.exceptions import ParsingFailed
+from dfes.memo import BansCache, DiskTier
+from dfes.model import AffectedAreas, TotalFireBans
+from generate import render_bans_as_html
+
+
+@pytest.fixture
+def description() -> str:
+    return render_bans_as_html(
+        TotalFireBans(
+            revoked=False,
+            issued=datetime(2023, 10, 15, 17, 6, tzinfo=ZoneInfo(key='Australia/Perth')),
+            declared_for=date(2023, 10, 16),
+            locations=AffectedAreas([('Perth Metropolitan', 'Armadale')]),
+        )
+    )
+
+
+def test_should_count_hits_and_misses(description):
+    cache = BansCache()
+    first = cache.parse(description)
+    second = cache.parse(description)
+    assert first == second
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+
+def test_should_copy_cached_bans(description):
+    cache = BansCache()
+    cache.parse(description).locations.pairs.append(("Corrupted", "Corrupted"))
+    assert cache.parse(description).locations.pairs == [('Perth Metropolitan', 'Armadale')]
+
+
+def test_should_evict_least_recently_used(description):
+    cache = BansCache(max_entries=1)
+    cache.parse(description)
+    cache.parse(description.replace("Armadale", "Bassendean"))
+    cache.parse(description)
+    assert len(cache) == 1
+    assert cache.stats.evictions == 2
+    assert cache.stats.misses == 3
+
+
+def test_should_not_cache_failures():
+    cache = BansCache()
+    for _ in range(2):
+        with pytest.raises(ParsingFailed):
+            cache.parse("This will not parse")
+    assert len(cache) == 0
+
+
+def test_should_share_disk_tier_between_caches(tmp_path, description):
+    BansCache(disk=DiskTier(tmp_path / "bans.sqlite3")).parse(description)
+
+    cache = BansCache(disk=DiskTier(tmp_path / "bans.sqlite3"))
+    cache.parse(description)
+
+    assert cache.stats.disk_hits == 1
+    assert cache.stats.misses == 0
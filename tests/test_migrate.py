@@ -2,9 +2,12 @@ from datetime import datetime, timezone
 from pathlib import Path
 
 import pytest
+from click.testing import CliRunner
 
-from dfes.migrate import migrate_to_seconds, delete_missing_seconds, missing_seconds
-from dfes.repository import FileRepository
+from dfes import commands
+from dfes.manifest import Manifest
+from dfes.migrate import migrate_to_seconds, delete_missing_seconds, missing_seconds, migrate_to_content
+from dfes.repository import FileRepository, ContentRepository, SqliteRepository
 from generate import create_feed, render_feed_as_rss
 
 
@@ -91,3 +94,57 @@ def test_should_migrate_when_mixed(tmp_path, create_with_seconds, create_without
     migrate_to_seconds(repository)
     combined_bans = create_with_seconds + create_without_seconds
     assert sorted(repository.published()) == sorted(combined_bans)
+
+
+def test_should_migrate_to_content(tmp_path, create_with_seconds):
+    repository = FileRepository(tmp_path)
+    repository.add_failed("unparseable", now=datetime(2021, 1, 2, tzinfo=timezone.utc))
+    assert migrate_to_content(repository) == 3
+
+    content = ContentRepository(tmp_path)
+    assert content.published() == create_with_seconds
+    assert content.retrieve_bans(create_with_seconds[0]) == repository.retrieve_bans(create_with_seconds[0])
+    assert content.list_failed() == repository.list_failed()
+
+
+def test_should_keep_files_unless_removal_requested(tmp_path, create_with_seconds):
+    repository = FileRepository(tmp_path)
+    migrate_to_content(repository)
+    assert repository.published() == create_with_seconds
+
+
+def test_should_remove_files_once_migrated(tmp_path, create_with_seconds):
+    repository = FileRepository(tmp_path)
+    migrate_to_content(repository, remove_files=True)
+    assert repository.published() == []
+    assert ContentRepository(tmp_path).published() == create_with_seconds
+
+
+def test_should_remove_compacted_feeds_once_migrated(tmp_path, create_with_seconds):
+    repository = FileRepository(tmp_path)
+    repository.compact(create_with_seconds[1])
+    migrate_to_content(repository, remove_files=True)
+
+    assert FileRepository(tmp_path).published() == []
+    assert list((tmp_path / "segments").glob("*.seg")) == []
+    assert ContentRepository(tmp_path).published() == create_with_seconds
+
+
+def test_should_rebuild_manifest_once_when_removing(tmp_path, create_with_seconds, monkeypatch):
+    repository = FileRepository(tmp_path)
+    repository.published()
+    rebuilds = []
+    rebuild = Manifest.rebuild
+    monkeypatch.setattr(Manifest, "rebuild", lambda self: rebuilds.append(1) or rebuild(self))
+
+    migrate_to_content(repository, remove_files=True)
+
+    assert repository.published() == []
+    assert len(rebuilds) == 1
+
+
+@pytest.mark.parametrize("command", [["migrate"], ["compact"]])
+def test_file_commands_reject_other_backends(tmp_path, monkeypatch, command):
+    monkeypatch.setattr(commands, "open_repository", lambda backend: SqliteRepository(tmp_path))
+    result = CliRunner().invoke(commands.dfes, ["--backend", "sqlite", *command])
+    assert result.exit_code == 2
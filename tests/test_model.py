@@ -0,0 +1,150 @@
+import pickle
+import tracemalloc
+from dataclasses import FrozenInstanceError
+from datetime import datetime, date, timezone
+
+import pytest
+
+from dfes.exceptions import LocationConflict
+from dfes.model import AffectedAreas, Feed, Item, LocationCatalogue, TotalFireBans, LOCATIONS, from_mask, to_mask
+
+PAIRS = [(f"Region {region}", f"District {region}-{district}") for region in range(6) for district in range(10)]
+
+
+def fresh(pairs: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    return [(region.encode().decode(), district.encode().decode()) for region, district in pairs]
+
+
+def footprint(build) -> int:
+    tracemalloc.start()
+    try:
+        kept = build()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert kept
+    return size
+
+
+@pytest.fixture
+def bans() -> TotalFireBans:
+    return TotalFireBans(
+        issued=datetime(2023, 10, 15, 17, 6, tzinfo=timezone.utc),
+        declared_for=date(2023, 10, 16),
+        locations=AffectedAreas([("Perth Metropolitan", "Armadale"), ("Midwest Gascoyne", "Exmouth")]),
+    )
+
+
+class TestLocationCatalogue:
+    def test_same_pair_same_code(self):
+        catalogue = LocationCatalogue()
+        assert catalogue.code("A", "B") == catalogue.code("A", "B")
+        assert catalogue.code("A", "C") != catalogue.code("A", "B")
+        assert len(catalogue) == 2
+
+    def test_pairs_are_interned(self):
+        catalogue = LocationCatalogue()
+        first = catalogue.pair(catalogue.code(*fresh([("A Region", "A District")])[0]))
+        second = catalogue.pair(catalogue.code(*fresh([("A Region", "A District")])[0]))
+        assert first[0] is second[0] and first[1] is second[1]
+
+
+class TestAffectedAreas:
+    def test_pairs_keep_order(self):
+        pairs = [("B", "2"), ("A", "1"), ("B", "1")]
+        assert AffectedAreas(pairs).pairs == pairs
+
+    def test_codes_index_shared_catalogue(self):
+        areas = AffectedAreas([("Perth Metropolitan", "Armadale")])
+        assert LOCATIONS.pair(areas.codes[0]) == ("Perth Metropolitan", "Armadale")
+        assert AffectedAreas.from_codes(areas.codes) == areas
+
+    def test_pickles_as_pairs(self):
+        areas = AffectedAreas([("Perth Metropolitan", "Armadale")])
+        assert pickle.loads(pickle.dumps(areas)) == areas
+        assert b"Armadale" in pickle.dumps(areas)
+
+    def test_interned_areas_use_less_memory(self):
+        plain = footprint(lambda: [fresh(PAIRS) for _ in range(200)])
+        compact = footprint(lambda: [AffectedAreas(fresh(PAIRS)) for _ in range(200)])
+        assert compact * 3 < plain
+
+
+class TestBitset:
+    @pytest.fixture
+    def south(self) -> AffectedAreas:
+        return AffectedAreas([("Great Southern", "Albany"), ("Great Southern", "Denmark")])
+
+    @pytest.fixture
+    def coast(self) -> AffectedAreas:
+        return AffectedAreas([("Great Southern", "Denmark"), ("Midwest Gascoyne", "Exmouth")])
+
+    def test_membership(self, south):
+        assert ("Great Southern", "Albany") in south
+        assert ("Midwest Gascoyne", "Exmouth") not in south
+        assert ("Never", "Registered") not in south
+
+    def test_union(self, south, coast):
+        assert sorted((south | coast).pairs) == [
+            ("Great Southern", "Albany"), ("Great Southern", "Denmark"), ("Midwest Gascoyne", "Exmouth")
+        ]
+
+    def test_intersection(self, south, coast):
+        assert (south & coast).pairs == [("Great Southern", "Denmark")]
+
+    def test_difference(self, south, coast):
+        assert (south - coast).pairs == [("Great Southern", "Albany")]
+
+    def test_mask_round_trips(self, south):
+        assert set(AffectedAreas.from_mask(south.mask).codes) == set(south.codes)
+        assert to_mask(from_mask(south.mask)) == south.mask
+
+
+class TestCatalogueFile:
+    def test_codes_are_stable_across_catalogues(self, tmp_path):
+        first = LocationCatalogue()
+        first.use_file(tmp_path / "locations.tsv")
+        codes = [first.code("A", "1"), first.code("B", "2")]
+
+        second = LocationCatalogue()
+        second.use_file(tmp_path / "locations.tsv")
+        assert [second.code("B", "2"), second.code("A", "1")] == codes[::-1]
+
+    def test_new_pairs_are_appended(self, tmp_path):
+        catalogue = LocationCatalogue()
+        catalogue.use_file(tmp_path / "locations.tsv")
+        catalogue.code("A", "1")
+        catalogue.code("A", "1")
+        assert (tmp_path / "locations.tsv").read_text() == "A\t1\n"
+
+    def test_codes_registered_earlier_are_appended(self, tmp_path):
+        (tmp_path / "locations.tsv").write_text("A\t1\n")
+        catalogue = LocationCatalogue()
+        catalogue.code("A", "1")
+        catalogue.code("X", "9")
+        catalogue.use_file(tmp_path / "locations.tsv")
+        assert catalogue.find("A", "1") == 0
+        assert (tmp_path / "locations.tsv").read_text() == "A\t1\nX\t9\n"
+
+    def test_conflicting_codes_fail(self, tmp_path):
+        (tmp_path / "locations.tsv").write_text("A\t1\n")
+        catalogue = LocationCatalogue()
+        catalogue.code("X", "9")
+        with pytest.raises(LocationConflict):
+            catalogue.use_file(tmp_path / "locations.tsv")
+        assert (tmp_path / "locations.tsv").read_text() == "A\t1\n"
+
+
+class TestSlots:
+    def test_bans_are_frozen(self, bans):
+        with pytest.raises(FrozenInstanceError):
+            bans.revoked = True
+
+    def test_no_instance_dicts(self, bans):
+        item = Item(published=bans.issued, description="", bans=bans)
+        feed = Feed(title="T", published=bans.issued, items=[item])
+        for value in (bans.locations, bans, item, feed):
+            assert not hasattr(value, "__dict__")
+
+    def test_bans_round_trip_through_pickle(self, bans):
+        assert pickle.loads(pickle.dumps(bans)) == bans
@@ -1,6 +1,11 @@
 from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
 
-from dfes.parser import Parser
+import pytest
+
+from dfes.exceptions import ParsingFailed
+from dfes.feeds import parse_feed
+from dfes.parser import Parser, probe
 from generate import create_feed, render_feed_as_rss
 
 
@@ -10,3 +15,44 @@ def test_extract_feed_published():
     rss = render_feed_as_rss(feed)
     parser = Parser(rss)
     assert parser.feed_published() == published
+
+
+def test_extract_item_count():
+    rss = render_feed_as_rss(create_feed(n_items=3))
+    assert Parser(rss).n_items() == 3
+
+
+def test_items_parsed_on_request():
+    feed = create_feed(n_items=2)
+    parser = Parser(render_feed_as_rss(feed))
+    assert parser.items() == feed.items
+
+
+@pytest.mark.parametrize(
+    "published",
+    [
+        datetime(2021, 1, 1, 1, 1, tzinfo=timezone.utc),
+        datetime(2024, 2, 22, 16, 38, 5, tzinfo=ZoneInfo("Australia/Perth")),
+    ]
+)
+def test_probe_agrees_with_full_parse(published):
+    rss = render_feed_as_rss(create_feed(published, 1))
+    assert probe(rss).published == parse_feed(rss).published
+
+
+def test_probe_rfc_822_date():
+    rss = render_feed_as_rss(create_feed(n_items=0)).replace(
+        "2000-01-02 00:00:00+00:00", "Thu, 22 Feb 2024 08:38:00 GMT"
+    )
+    assert probe(rss).published == parse_feed(rss).published == datetime(2024, 2, 22, 8, 38, tzinfo=timezone.utc)
+
+
+def test_probe_ignores_item_pub_date():
+    rss = "<rss><channel><item><pubDate>2000-01-01 00:00:00+00:00</pubDate></item></channel></rss>"
+    with pytest.raises(ParsingFailed):
+        probe(rss)
+
+
+def test_probe_unparseable_date():
+    with pytest.raises(ParsingFailed, match="Failed to parse pubDate"):
+        probe("<rss><channel><pubDate>Yesterday</pubDate></channel></rss>")
@@ -4,7 +4,8 @@ import pytest
 
 from conftest import repository
 from dfes.repository import to_bans_file_name, InMemoryRepository, to_feed_published_date, FileRepository, \
-    to_failed_file_name, to_failed_timestamp, FeedByPublished, FailedByFetched, is_bans_file
+    to_failed_file_name, to_failed_timestamp, FeedByPublished, FailedByFetched, is_bans_file, SqliteRepository, \
+    open_repository, read_ahead
 
 
 @pytest.fixture
@@ -69,6 +70,59 @@ def test_should_persist_when_on_file_system(tmp_path):
     assert repository.published() == [datetime(2001, 1, 1, 0, 0, tzinfo=timezone.utc)]
 
 
+def test_should_persist_when_in_sqlite(tmp_path):
+    feed_published = datetime(2001, 1, 1, 0, 0, tzinfo=timezone.utc)
+    repository = SqliteRepository(tmp_path)
+    repository.add_bans(feed_published, "Bans for January 2nd")
+    repository = SqliteRepository(tmp_path)
+    assert repository.published() == [feed_published]
+
+
+def test_should_import_file_repository_into_sqlite(tmp_path):
+    dt = datetime.fromisoformat("2023-10-15 04:08:00+00:00")
+    files = FileRepository(tmp_path / "files")
+    files.add_bans(dt, "Bans for January 3rd")
+    files.add_failed("unparseable", now=dt)
+
+    database = SqliteRepository(tmp_path / "database")
+    assert database.import_from(files) == 2
+    assert database.retrieve_bans(dt) == "Bans for January 3rd"
+    assert database.retrieve_failed(dt) == "unparseable"
+
+
+@pytest.mark.parametrize(
+    "backend,expected",
+    [
+        ("file", FileRepository),
+        ("sqlite", SqliteRepository),
+    ]
+)
+def test_open_repository(tmp_path, backend, expected):
+    assert isinstance(open_repository(backend, tmp_path), expected)
+
+
+@pytest.mark.parametrize(
+    "start,end,expected",
+    [
+        (None, None, [0, 1, 2]),
+        (datetime(2023, 1, 3, 5, 5, tzinfo=timezone.utc), None, [1, 2]),
+        (None, datetime(2023, 1, 3, 5, 5, tzinfo=timezone.utc), [0, 1]),
+        (datetime(2023, 1, 3, 12, tzinfo=timezone(timedelta(hours=8))), datetime(2023, 1, 4, tzinfo=timezone.utc), [1]),
+    ]
+)
+def test_published_between(three_bans, start, end, expected):
+    published = three_bans.published()
+    assert three_bans.published_between(start, end) == [published[index] for index in expected]
+
+
+def test_last_failed(four_failed):
+    assert four_failed.retrieve_failed(four_failed.last_failed()) == "Bad feed four"
+
+
+def test_no_last_failed(repository):
+    assert repository.last_failed() is None
+
+
 def test_to_bans_file_name():
     feed_published = datetime.fromisoformat("2023-10-15 04:08:11+00:00")
     assert to_bans_file_name(feed_published) == "bans_issued_2023_10_15_040811.rss"
@@ -181,6 +235,84 @@ class TestFeedByPublished:
                    "Bans for January 5th",
         ]
 
+    def test_should_slice(self, three_bans):
+        assert list(FeedByPublished(three_bans)[1:]) == [
+            "Bans for January 4th", "Bans for January 5th",
+        ]
+
+    def test_should_slice_in_reverse(self, three_bans):
+        assert list(FeedByPublished(three_bans)[::-1]) == [
+            "Bans for January 5th", "Bans for January 4th", "Bans for January 3rd",
+        ]
+
+    def test_should_slice_within_range(self, three_bans):
+        start = three_bans.published()[1]
+        assert list(FeedByPublished(three_bans, start=start)[:1]) == ["Bans for January 4th"]
+
+    def test_should_list_published_once(self, three_bans):
+        counting = CountingRepository(three_bans)
+        feeds = FeedByPublished(counting)
+        _ = [feeds[index] for index in range(len(feeds))]
+        _ = list(reversed(feeds))
+        assert counting.published_calls == 1
+
+    def test_should_read_lazily_in_reverse(self, three_bans):
+        counting = CountingRepository(three_bans)
+        assert next(reversed(FeedByPublished(counting))) == "Bans for January 5th"
+        assert counting.retrieve_calls == 1
+
+    def test_should_fail_when_feed_missing(self, three_bans):
+        feeds = FeedByPublished(three_bans)
+        with pytest.raises(KeyError):
+            feeds.retrieve(datetime(2001, 1, 1, tzinfo=timezone.utc))
+
+    def test_should_keep_snapshot(self, three_bans):
+        feeds = FeedByPublished(three_bans)
+        assert len(feeds) == 3
+        three_bans.add_bans(datetime(2023, 1, 5, 5, 5, tzinfo=timezone.utc), "Bans for January 6th")
+        assert len(feeds) == 3
+        assert len(FeedByPublished(three_bans)) == 4
+
+    def test_should_prefetch_in_order(self, three_bans):
+        assert list(FeedByPublished(three_bans).prefetch(depth=2)) == [
+            "Bans for January 3rd", "Bans for January 4th", "Bans for January 5th",
+        ]
+
+    def test_should_prefetch_in_reverse(self, three_bans):
+        assert list(FeedByPublished(three_bans).prefetch_reversed(depth=2)) == [
+            "Bans for January 5th", "Bans for January 4th", "Bans for January 3rd",
+        ]
+
+
+class TestReadAhead:
+    def test_should_read_sequentially_without_depth(self):
+        assert list(read_ahead(str, [1, 2, 3], depth=0)) == ["1", "2", "3"]
+
+    def test_should_preserve_order(self):
+        assert list(read_ahead(str, range(100), depth=8)) == [str(n) for n in range(100)]
+
+    def test_should_bound_reads_in_flight(self):
+        read = []
+        feeds = read_ahead(lambda key: read.append(key) or key, range(100), depth=4)
+        assert next(feeds) == 0
+        feeds.close()
+        assert len(read) <= 5
+
+
+class CountingRepository:
+    def __init__(self, repository):
+        self._repository = repository
+        self.published_calls = 0
+        self.retrieve_calls = 0
+
+    def published(self):
+        self.published_calls += 1
+        return self._repository.published()
+
+    def retrieve_bans(self, feed_published):
+        self.retrieve_calls += 1
+        return self._repository.retrieve_bans(feed_published)
+
 
 class TestFailedByFetched:
     def test_should_provide_number_of_failed_feeds(self, four_failed):
@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from dfes.exceptions import ParsingFailed
+from dfes.feeds import parse_feed, parse_feed_with_feedparser, stream_feed
+from dfes.model import AffectedAreas, Feed, Item, TotalFireBans
+from dfes.rss import RssStream, Unsupported, canonical_html
+from generate import create_feed, render_bans_as_html, render_feed_as_rss
+
+
+def revoked_feed() -> Feed:
+    published = datetime(2023, 12, 24, 3, 15, tzinfo=timezone.utc)
+    bans = TotalFireBans(
+        revoked=True,
+        issued=published.astimezone(ZoneInfo("Australia/Perth")).replace(second=0),
+        declared_for=published.date(),
+        locations=AffectedAreas([("Great Southern", "Albany"), ("Great Southern", "Denmark"), ("Midwest", "Irwin")]),
+    )
+    item = Item(published=published, description=render_bans_as_html(bans), bans=bans)
+    return Feed(title="Total Fire Ban (All Regions)", published=published + timedelta(hours=1), items=[item])
+
+
+CORPUS = [
+    create_feed(n_items=0),
+    create_feed(n_items=1),
+    create_feed(datetime(2021, 3, 1, 23, 59, 59, tzinfo=timezone.utc), 5),
+    create_feed(datetime(2023, 10, 1, 2, 30, tzinfo=ZoneInfo("Australia/Perth")), 3),
+    revoked_feed(),
+]
+
+
+@pytest.mark.parametrize("feed", CORPUS)
+def test_stream_matches_feedparser(feed):
+    rss = render_feed_as_rss(feed)
+    assert stream_feed(rss, bans="eager") == parse_feed_with_feedparser(rss, bans="eager")
+
+
+@pytest.mark.parametrize("feed", CORPUS)
+def test_stream_matches_generated_feed(feed):
+    assert stream_feed(render_feed_as_rss(feed), bans="eager") == feed
+
+
+def test_small_chunks_give_same_entries():
+    rss = render_feed_as_rss(create_feed(n_items=4))
+    assert list(RssStream(rss, chunk_size=7)) == list(RssStream(rss))
+
+
+@pytest.mark.parametrize("date_text", [
+    "Sat, 01 Jan 2000 10:00:00 +0800",
+    "1 Jan 2000 10:00 GMT",
+    "Sat, 01 Jan 2000 10:00:00 UT",
+    "2000-01-01T10:00:00Z",
+    "2000-01-01 10:00:00+08:00",
+])
+def test_date_formats_match_feedparser(date_text):
+    rss = render_feed_as_rss(create_feed(n_items=1)).replace("2000-01-02 00:00:00+00:00", date_text)
+    assert stream_feed(rss) == parse_feed_with_feedparser(rss)
+
+
+class TestFallback:
+    @staticmethod
+    def failure(parse, rss) -> str:
+        with pytest.raises(ParsingFailed) as failed:
+            parse(rss)
+        return str(failed.value)
+
+    @pytest.mark.parametrize("rss", [
+        "Not the expected xml string",
+        "<rss><channel><title>T</title></channel></rss>",
+        "<rss><channel><title>T</title><pubDate>Sat, 01 Jan 2000 10:00:00 +0800</pubDate>"
+        "<item><description>D</description></item></channel></rss>",
+        "<rss><channel><title>T</title><pubDate>Sat, 01 Jan 2000 10:00:00 +0800</pubDate>"
+        "<item><pubDate>Sat, 01 Jan 2000 10:00:00 +0800</pubDate></item></channel></rss>",
+        "<rss><channel><title>T</title><pubDate>Sat, 01 Jan 2000 10:00:00 +0800</pubDate>"
+        "<item><pubDate>Sat, 01 Jan 2000 10:00:00 +0800</pubDate><description>D</description></channel></rss>",
+    ])
+    def test_failures_match_feedparser(self, rss):
+        assert self.failure(parse_feed, rss) == self.failure(parse_feed_with_feedparser, rss)
+
+    def test_bad_description_matches_feedparser(self, bad_description):
+        assert parse_feed(bad_description, bans="none") == parse_feed_with_feedparser(bad_description, bans="none")
+
+    @pytest.mark.parametrize("old, new", [
+        ("<div>", "<div class=\"tfb\">"),
+        ("<br />", "<br>"),
+        ("Time of issue:", "Time &amp; date of issue:"),
+        ("Total Fire Ban (All Regions)", "Total Fire Ban &amp; More"),
+        ("<rss version=\"2.0\">", "<!-- comment --><rss version=\"2.0\">"),
+        ("UTF-8", "ISO-8859-1"),
+    ])
+    def test_unusual_markup_matches_feedparser(self, old, new):
+        rss = render_feed_as_rss(create_feed(n_items=2)).replace(old, new)
+        assert parse_feed(rss, bans="none") == parse_feed_with_feedparser(rss, bans="none")
+
+
+class TestUnsupported:
+    @pytest.mark.parametrize("rss", [
+        "<feed xmlns=\"http://www.w3.org/2005/Atom\"></feed>",
+        "<rss><channel><title>T</title><pubDate>yesterday</pubDate></channel></rss>",
+        "<rss><channel><title>T</title><pubDate>Sat, 01 Jan 2000 10:00:00 +0800</pubDate>"
+        "<image><title>I</title></image></channel></rss>",
+    ])
+    def test_stream_declines(self, rss):
+        with pytest.raises(Unsupported):
+            list(RssStream(rss))
+
+
+class TestCanonicalHtml:
+    @pytest.mark.parametrize("html", [
+        "Plain text",
+        "<div><p>A &amp; B&nbsp;C</p></div>",
+        "<p><br /><span style=\"color: #777777;\">Time</span></p>",
+        "<ul><li>One</li><li>Two</li></ul>",
+    ])
+    def test_canonical(self, html):
+        assert canonical_html(html)
+
+    @pytest.mark.parametrize("html", [
+        "<div><p>Unclosed</div>",
+        "<p>Unopened</p></div>",
+        "<br>",
+        "<script>alert()</script>",
+        "<P>Upper</P>",
+        "<p class=\"x\">Class</p>",
+        "<span style='color: #777777;'>Quotes</span>",
+        "<span style=\"color:#777777\">Spacing</span>",
+        "<p>A & B</p>",
+        "<p>A > B</p>",
+        "<p>&lt;</p>",
+    ])
+    def test_needs_sanitising(self, html):
+        assert not canonical_html(html)
@@ -0,0 +1,96 @@
+from datetime import datetime, timezone
+
+import pytest
+from click.testing import CliRunner
+
+from dfes import commands
+from dfes.repository import FileRepository, FeedByPublished
+from dfes.segments import Segments, to_segment_name
+
+
+@pytest.fixture
+def feeds() -> list[tuple[datetime, str]]:
+    return [
+        (datetime(2023, 10, 30, 5, 5, tzinfo=timezone.utc), "Bans for October 31st"),
+        (datetime(2023, 10, 31, 5, 5, tzinfo=timezone.utc), "Bans for November 1st"),
+        (datetime(2023, 11, 1, 5, 5, tzinfo=timezone.utc), "Bans for November 2nd"),
+    ]
+
+
+def test_to_segment_name():
+    assert to_segment_name(datetime(2023, 10, 30, 5, 5, tzinfo=timezone.utc)) == "2023_10"
+
+
+def test_should_pack_one_segment_per_month(tmp_path, feeds):
+    Segments(tmp_path).pack(feeds)
+    assert sorted(path.name for path in tmp_path.glob("*.seg")) == ["2023_10.seg", "2023_11.seg"]
+
+
+def test_should_retrieve_packed(tmp_path, feeds):
+    segments = Segments(tmp_path)
+    segments.pack(feeds)
+    assert segments.published() == [published for published, _ in feeds]
+    assert [segments.retrieve(published) for published, _ in feeds] == [text for _, text in feeds]
+
+
+def test_should_merge_with_existing_segment(tmp_path, feeds):
+    segments = Segments(tmp_path)
+    segments.pack(feeds[:1])
+    segments.pack(feeds[1:])
+    assert segments.retrieve(feeds[0][0]) == "Bans for October 31st"
+    assert len(segments.published()) == 3
+
+
+def test_should_not_retrieve_missing(tmp_path, feeds):
+    segments = Segments(tmp_path)
+    segments.pack(feeds)
+    assert segments.retrieve(datetime(2001, 1, 1, tzinfo=timezone.utc)) is None
+
+
+def test_should_discard_packed(tmp_path, feeds):
+    segments = Segments(tmp_path)
+    segments.pack(feeds)
+    segments.discard([feeds[0][0], feeds[2][0]])
+
+    assert segments.published() == [feeds[1][0]]
+    assert segments.retrieve(feeds[1][0]) == "Bans for November 1st"
+    assert sorted(path.name for path in tmp_path.glob("*.seg")) == ["2023_10.seg"]
+
+
+class TestCompact:
+    def test_should_pack_feeds_before(self, tmp_path, feeds):
+        repository = FileRepository(tmp_path)
+        for published, text in feeds:
+            repository.add_bans(published, text)
+
+        assert repository.compact(datetime(2023, 11, 1, tzinfo=timezone.utc)) == 2
+        assert len(list(tmp_path.glob("bans_issued_*.rss"))) == 1
+
+    def test_should_read_packed_and_loose_together(self, tmp_path, feeds):
+        repository = FileRepository(tmp_path)
+        for published, text in feeds:
+            repository.add_bans(published, text)
+
+        repository.compact(datetime(2023, 11, 1, tzinfo=timezone.utc))
+
+        assert repository.published() == [published for published, _ in feeds]
+        assert list(FeedByPublished(FileRepository(tmp_path))) == [text for _, text in feeds]
+
+    def test_should_prefer_loose_feed_added_after_packing(self, tmp_path, feeds):
+        repository = FileRepository(tmp_path)
+        published, _ = feeds[0]
+        repository.add_bans(published, "Packed")
+        repository.compact(datetime(2024, 1, 1, tzinfo=timezone.utc))
+        repository.add_bans(published, "Loose")
+        assert repository.published() == [published]
+        assert repository.retrieve_bans(published) == "Loose"
+
+    def test_compact_before_is_perth_time(self, tmp_path, monkeypatch):
+        repository = FileRepository(tmp_path)
+        repository.add_bans(datetime(2023, 10, 31, 15, 30, tzinfo=timezone.utc), "Bans for October 31st")
+        repository.add_bans(datetime(2023, 10, 31, 16, 30, tzinfo=timezone.utc), "Bans for November 1st")
+        monkeypatch.setattr(commands, "open_repository", lambda backend: repository)
+
+        result = CliRunner().invoke(commands.dfes, ["compact", "--before", "2023-11-01"], catch_exceptions=False)
+
+        assert result.output == "Packed 1 feeds.\n"
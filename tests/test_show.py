@@ -2,9 +2,12 @@ from datetime import datetime, date, timezone, timedelta
 
 import pytest
 
+from dfes import show
 from dfes.fetch import store_feed
 from dfes.model import TotalFireBans, AffectedAreas, Item, Feed
+from dfes.repository import FileRepository
 from dfes.show import to_show, last_issued, latest_bans, LatestItems
+from dfes.snapshot import bans_snapshot
 from generate import render_feed_as_rss, create_feed
 
 
@@ -193,3 +196,62 @@ class TestLastIssued:
         swapped = [two_declared[1], two_declared[0]]
         recent = last_issued(swapped)
         assert recent.bans.issued == datetime(2000, 1, 2, 3)
+
+
+class TestSnapshot:
+    @pytest.fixture
+    def repository(self, tmp_path):
+        return FileRepository(tmp_path)
+
+    @pytest.fixture
+    def snapshot(self, repository):
+        return bans_snapshot(repository.location)
+
+    @pytest.fixture
+    def no_scan(self, monkeypatch):
+        def fail(feeds, cache):
+            raise AssertionError("feeds were parsed")
+
+        monkeypatch.setattr(show, "parse_feeds", fail)
+
+    @staticmethod
+    def store(repository, snapshot, feed: Feed):
+        store_feed(render_feed_as_rss(feed), repository, snapshot=snapshot)
+
+    def test_fetch_writes_snapshot(self, repository, snapshot):
+        feed = create_feed(datetime(2023, 10, 13, tzinfo=timezone.utc), 2)
+        self.store(repository, snapshot, feed)
+        assert snapshot.read().bans == to_show(repository)
+
+    def test_show_reads_snapshot_without_parsing(self, repository, snapshot, no_scan):
+        feed = create_feed(datetime(2023, 10, 13, tzinfo=timezone.utc), 2)
+        self.store(repository, snapshot, feed)
+        assert to_show(repository, snapshot=snapshot) == (feed.items[1].bans,)
+
+    def test_empty_feed_carries_bans_forward(self, repository, snapshot, no_scan):
+        earlier = create_feed(datetime(2023, 10, 13, tzinfo=timezone.utc), 1)
+        later = Feed(title=earlier.title, published=earlier.published + timedelta(hours=1), items=[])
+        self.store(repository, snapshot, earlier)
+        self.store(repository, snapshot, later)
+        assert snapshot.read().published == later.published
+        assert to_show(repository, snapshot=snapshot) == (earlier.items[0].bans,)
+
+    def test_older_feed_leaves_snapshot(self, repository, snapshot, no_scan):
+        later = create_feed(datetime(2023, 10, 13, tzinfo=timezone.utc), 1)
+        self.store(repository, snapshot, later)
+        self.store(repository, snapshot, create_feed(datetime(2023, 10, 12, tzinfo=timezone.utc), 1))
+        assert to_show(repository, snapshot=snapshot) == (later.items[0].bans,)
+
+    def test_missing_snapshot_is_rebuilt_by_scan(self, repository, snapshot):
+        feed = create_feed(datetime(2023, 10, 13, tzinfo=timezone.utc), 1)
+        store_feed(render_feed_as_rss(feed), repository)
+        assert snapshot.read() is None
+        assert to_show(repository, snapshot=snapshot) == (feed.items[0].bans,)
+        assert snapshot.current(repository).bans == (feed.items[0].bans,)
+
+    def test_stale_snapshot_falls_back_to_scan(self, repository, snapshot):
+        self.store(repository, snapshot, create_feed(datetime(2023, 10, 12, tzinfo=timezone.utc), 1))
+        later = create_feed(datetime(2023, 10, 13, tzinfo=timezone.utc), 1)
+        store_feed(render_feed_as_rss(later), repository)
+        assert snapshot.current(repository) is None
+        assert to_show(repository, snapshot=snapshot) == (later.items[0].bans,)
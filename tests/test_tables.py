@@ -0,0 +1,241 @@
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import polars as pl
+import pytest
+
+from dfes import analyze
+from dfes.analyze import Contexts, to_dataframe
+from dfes.columns import column_store
+from dfes.fetch import store_feed
+from dfes.migrate import rebuild_column_store
+from dfes.model import AffectedAreas, Feed, Item, TotalFireBans
+from dfes.repository import FeedByPublished, FileRepository, InMemoryRepository
+from dfes.tables import LazyTables, Tables, to_tables
+from generate import create_feed, render_bans_as_html, render_feed_as_rss
+
+
+def feed_with(published: datetime, district: str) -> Feed:
+    region = "Great Southern" if district == "Albany" else "Midwest Gascoyne"
+    bans = TotalFireBans(
+        issued=published.replace(tzinfo=ZoneInfo("Australia/Perth")),
+        declared_for=published.date(),
+        locations=AffectedAreas([(region, district)]),
+    )
+    item = Item(published=published, description=render_bans_as_html(bans), bans=bans)
+    return Feed(title="Total Fire Ban (All Regions)", published=published, items=[item])
+
+
+@pytest.fixture
+def feeds():
+    first = datetime(2023, 12, 2, tzinfo=timezone.utc)
+    return [create_feed(first, 2), create_feed(first + timedelta(days=1), 2)]
+
+
+class TestToTables:
+    def test_shared_entries_stored_once(self, feeds):
+        tables = to_tables(feeds)
+        assert tables.feed_entries.height == 4
+        assert tables.entries.height == 3
+        assert tables.entry_locations.height == 3
+        assert tables.feeds.height == 2
+
+    def test_wide_matches_exploded_frame(self, feeds):
+        assert to_tables(feeds).wide().equals(to_dataframe(feeds))
+
+    def test_entry_level_matches_feed_order(self, feeds):
+        entry_level = to_tables(feeds).entry_level()
+        assert entry_level.get_column("entry_index").to_list() == [0, 1, 0, 1]
+        assert entry_level.get_column("entry_published").dt.day().to_list() == [1, 2, 2, 3]
+
+
+class TestContexts:
+    @pytest.fixture
+    def contexts(self, feeds):
+        return Contexts(to_tables(feeds))
+
+    def test_no_locations_needs_no_unique(self, contexts):
+        assert contexts.no_locations().height == 4
+        assert "region" not in contexts.no_locations().columns
+
+    def test_display(self, contexts):
+        assert contexts.display().height == 4
+
+    def test_publish_delay(self, contexts):
+        assert contexts.publish_delay().item() == timedelta(days=1)
+
+    def test_max_delay_matches_exploded_frame(self, contexts, feeds):
+        df = to_dataframe(feeds)
+        assert contexts.max_delay().item() == (df["declared_for"] - df["issued"].cast(pl.Date)).max()
+
+
+class TestIncremental:
+    @pytest.fixture
+    def parsed(self, monkeypatch):
+        counts = []
+        original = analyze.parsed_feeds
+
+        def counting(feeds):
+            counts.append(len(feeds))
+            return original(feeds)
+
+        monkeypatch.setattr(analyze, "parsed_feeds", counting)
+        return counts
+
+    @staticmethod
+    def store(repository, day: int):
+        feed = create_feed(datetime(2023, 12, day, tzinfo=timezone.utc), 2)
+        store_feed(render_feed_as_rss(feed), repository)
+
+    @pytest.fixture
+    def repository(self, tmp_path):
+        repository = FileRepository(tmp_path)
+        for day in (2, 3):
+            self.store(repository, day)
+        return repository
+
+    def test_only_newer_feeds_are_parsed(self, repository, tmp_path, parsed):
+        analyze.import_incrementally(repository, tmp_path / "contexts")
+        self.store(repository, 4)
+        tables = analyze.import_incrementally(repository, tmp_path / "contexts")
+
+        assert parsed == [2, 1]
+        assert tables.feeds.height == 3
+        assert tables.entries.height == 4
+
+    def test_matches_full_import(self, repository, tmp_path):
+        analyze.import_incrementally(repository, tmp_path / "contexts")
+        self.store(repository, 4)
+        incremental = analyze.import_incrementally(repository, tmp_path / "contexts")
+        full = analyze.import_incrementally(repository, tmp_path / "other")
+        assert incremental.wide().equals(full.wide())
+
+    def test_older_feed_forces_rebuild(self, repository, tmp_path, parsed):
+        analyze.import_incrementally(repository, tmp_path / "contexts")
+        self.store(repository, 1)
+        tables = analyze.import_incrementally(repository, tmp_path / "contexts")
+
+        assert parsed == [2, 3]
+        assert tables.feeds.get_column("feed_published").dt.day().to_list() == [1, 2, 3]
+
+    def test_nothing_new_parses_nothing(self, repository, tmp_path, parsed):
+        analyze.import_incrementally(repository, tmp_path / "contexts")
+        written = (tmp_path / "contexts" / "entries" / "0000000000.parquet").stat().st_mtime_ns
+        tables = analyze.import_incrementally(repository, tmp_path / "contexts")
+
+        assert parsed == [2]
+        assert (tmp_path / "contexts" / "entries" / "0000000000.parquet").stat().st_mtime_ns == written
+        assert tables.feeds.height == 2
+
+    def test_newer_feeds_are_written_as_new_parts(self, repository, tmp_path, monkeypatch):
+        analyze.update_tables(repository, tmp_path / "contexts")
+        self.store(repository, 4)
+        monkeypatch.setattr(Tables, "read", None)
+        analyze.update_tables(repository, tmp_path / "contexts")
+
+        assert sorted(path.name for path in (tmp_path / "contexts" / "entries").iterdir()) == [
+            "0000000000.parquet", "0000000002.parquet"
+        ]
+        scanned = LazyTables.scan(tmp_path / "contexts")
+        assert scanned.entries.collect().height == 4
+        assert scanned.feeds.collect().height == 3
+
+    def test_full_import_reads_column_store(self, repository, tmp_path, parsed):
+        store = column_store(repository.location)
+        rebuild_column_store(repository, store, workers=1)
+
+        tables = analyze.import_incrementally(repository, tmp_path / "contexts", store)
+        full = analyze.import_incrementally(repository, tmp_path / "other")
+
+        assert parsed == [2]
+        assert tables.wide().equals(full.wide())
+        assert tables.entries.equals(full.entries)
+        assert tables.feeds.equals(full.feeds)
+
+    def test_incomplete_column_store_is_ignored(self, repository, tmp_path, parsed):
+        store = column_store(repository.location)
+        rebuild_column_store(repository, store, workers=1)
+        store_feed(render_feed_as_rss(create_feed(datetime(2023, 12, 4, tzinfo=timezone.utc), 2)), repository)
+
+        tables = analyze.import_incrementally(repository, tmp_path / "contexts", store)
+        assert parsed == [3]
+        assert tables.feeds.height == 3
+
+
+class TestLazyTables:
+    @pytest.fixture
+    def scanned(self, tmp_path, feeds):
+        to_tables(feeds).write(tmp_path)
+        return LazyTables.scan(tmp_path)
+
+    def test_scan_matches_tables(self, scanned, feeds):
+        assert scanned.wide().collect().equals(to_tables(feeds).wide())
+
+    def test_date_filter_is_pushed_to_scan(self, scanned):
+        start = datetime(2023, 12, 3, 8)
+        plan = scanned.filtered(start=start).feed_entries.explain()
+        assert "SELECTION" in plan and "feed_published" in plan
+
+    def test_date_filter(self, scanned):
+        filtered = scanned.filtered(start=datetime(2023, 12, 3, 8))
+        assert filtered.entry_level().collect().get_column("entry_index").to_list() == [0, 1]
+        assert filtered.entries.collect().height == 2
+
+    def test_location_filter_is_pushed_to_scan(self, scanned):
+        plan = scanned.filtered(regions=["A Region"]).entry_locations.explain()
+        assert "SELECTION" in plan and "location_code" in plan
+
+    @pytest.mark.parametrize("regions, districts, n_entries", [
+        (["A Region"], None, 4),
+        (None, ["A District"], 4),
+        (["Elsewhere"], None, 0),
+    ])
+    def test_location_filter(self, scanned, regions, districts, n_entries):
+        filtered = scanned.filtered(regions=regions, districts=districts)
+        assert filtered.entry_level().collect().height == n_entries
+
+    def test_contexts_cache_entry_level(self, scanned):
+        contexts = Contexts(scanned)
+        assert contexts.no_locations() is contexts.no_locations()
+        assert contexts.display().height == 4
+
+    def test_contexts_take_filters(self, scanned):
+        contexts = Contexts(scanned, end=datetime(2023, 12, 3, 7))
+        assert contexts.feeds_and_entries().height == 2
+        assert contexts.publish_delay().item() == timedelta(days=1)
+
+
+class TestFromRepository:
+    @pytest.fixture
+    def repository(self, tmp_path):
+        repository = FileRepository(tmp_path)
+        for day, district in [(2, "Albany"), (5, "Exmouth"), (9, "Albany")]:
+            store_feed(render_feed_as_rss(feed_with(datetime(2023, 12, day, tzinfo=timezone.utc), district)), repository)
+        return repository
+
+    def test_bounds_limit_feeds_read(self, repository):
+        contexts = Contexts.from_repository(repository, start=datetime(2023, 12, 4), end=datetime(2023, 12, 6))
+        assert contexts.stats.feeds == 1
+        assert contexts.no_locations().height == 1
+
+    def test_unmatched_items_are_skipped(self, repository):
+        contexts = Contexts.from_repository(repository, districts=["Exmouth"])
+        assert (contexts.stats.entries, contexts.stats.skipped) == (1, 2)
+        assert contexts.base().get_column("district").cast(pl.String).to_list() == ["Exmouth"]
+
+    def test_matches_filtered_full_import(self, repository):
+        scoped = Contexts.from_repository(repository, regions=["Great Southern"], end=datetime(2023, 12, 8))
+        full = Contexts(to_tables(analyze.parsed_feeds(FeedByPublished(repository))),
+                        regions=["Great Southern"], end=datetime(2023, 12, 8))
+        assert scoped.base().equals(full.base())
+
+    def test_repository_without_location(self):
+        repository = InMemoryRepository()
+        store_feed(render_feed_as_rss(feed_with(datetime(2023, 12, 2, tzinfo=timezone.utc), "Albany")), repository)
+        assert Contexts.from_repository(repository).stats.feeds == 1
+
+    def test_stats_report_time_and_memory(self, repository):
+        stats = Contexts.from_repository(repository, trace_memory=True).stats
+        assert stats.seconds > 0
+        assert stats.peak_bytes > 0
+        assert stats.table_bytes > 0
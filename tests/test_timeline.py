@@ -0,0 +1,121 @@
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from click.testing import CliRunner
+
+from dfes import commands
+from dfes.fetch import store_feed
+from dfes.migrate import rebuild_timeline
+from dfes.model import Feed
+from dfes.repository import FeedByPublished, FileRepository
+from dfes.show import latest_bans, to_show
+from dfes.timeline import Timeline, bans_timeline
+from generate import create_feed, render_feed_as_rss
+
+FIRST = datetime(2023, 12, 2, tzinfo=timezone.utc)
+
+
+def empty_feed(published: datetime) -> Feed:
+    return Feed(title="Total Fire Ban (All Regions)", published=published, items=[])
+
+
+@pytest.fixture
+def feeds():
+    return [
+        create_feed(FIRST, 1),
+        replace(create_feed(FIRST, 1), published=FIRST + timedelta(hours=6)),
+        empty_feed(FIRST + timedelta(hours=12)),
+        create_feed(FIRST + timedelta(days=1), 2),
+    ]
+
+
+@pytest.fixture
+def timeline(tmp_path, feeds):
+    timeline = Timeline(tmp_path / "timeline")
+    timeline.rebuild(feeds)
+    return timeline
+
+
+class TestTimeline:
+    def test_identical_runs_are_stored_once(self, timeline):
+        assert len(timeline.times()) == 2
+
+    @pytest.mark.parametrize("offset", [
+        timedelta(0), timedelta(hours=7), timedelta(hours=13), timedelta(days=1), timedelta(days=3),
+    ])
+    def test_at_matches_scan(self, timeline, feeds, offset):
+        moment = FIRST + offset
+        earlier = reversed([feed for feed in feeds if feed.published <= moment])
+        assert timeline.at(moment) == latest_bans(earlier)
+
+    def test_before_first_feed(self, timeline):
+        assert timeline.at(FIRST - timedelta(seconds=1)) == tuple()
+
+    def test_extend_appends_changes(self, timeline):
+        later = create_feed(FIRST + timedelta(days=3), 1)
+        assert timeline.extend([later]) == 1
+        assert timeline.last_published() == later.published
+        assert timeline.at(later.published) == (later.items[0].bans,)
+
+    def test_older_feed_invalidates(self, timeline):
+        timeline.extend([create_feed(FIRST + timedelta(hours=1), 1)])
+        assert not timeline.exists()
+
+    def test_extend_after_invalidate_starts_again(self, timeline, feeds):
+        timeline.invalidate()
+        timeline.extend(feeds[:1])
+        assert len(timeline.times()) == 1
+        assert timeline.at(FIRST) == latest_bans(feeds[:1])
+
+
+@pytest.fixture
+def repository(tmp_path, feeds):
+    repository = FileRepository(tmp_path / "repository")
+    for feed in feeds:
+        store_feed(render_feed_as_rss(feed), repository)
+    return repository
+
+
+def test_rebuild_from_repository(repository):
+    timeline = bans_timeline(repository.location)
+    rebuild_timeline(repository, timeline, workers=1)
+    assert timeline.current(repository)
+    assert timeline.at(datetime.now(timezone.utc)) == to_show(repository)
+
+
+def test_fetch_extends_current_timeline(repository):
+    timeline = bans_timeline(repository.location)
+    rebuild_timeline(repository, timeline, workers=1)
+
+    later = create_feed(FIRST + timedelta(days=2), 1)
+    store_feed(render_feed_as_rss(later), repository, timeline=timeline)
+
+    assert timeline.current(repository)
+    assert timeline.at(datetime.now(timezone.utc)) == to_show(repository)
+
+
+def test_fetch_leaves_stale_timeline(repository):
+    timeline = bans_timeline(repository.location)
+    rebuild_timeline(repository, timeline, workers=1)
+    store_feed(render_feed_as_rss(create_feed(FIRST + timedelta(days=2), 1)), repository)
+
+    store_feed(render_feed_as_rss(create_feed(FIRST + timedelta(days=3), 1)), repository, timeline=timeline)
+    assert not timeline.current(repository)
+
+
+def test_show_at(repository, feeds, monkeypatch):
+    monkeypatch.setattr(commands, "open_repository", lambda backend: repository)
+    result = CliRunner().invoke(commands.dfes, ["show", "--at", "2023-12-02 16:00:00"], catch_exceptions=False)
+
+    assert f"Issued: {feeds[0].items[0].bans.issued}" in result.output
+    assert f"Issued: {feeds[3].items[1].bans.issued}" not in result.output
+    assert bans_timeline(repository.location).current(repository)
+
+
+def test_show_at_before_first_feed(repository, monkeypatch):
+    monkeypatch.setattr(commands, "open_repository", lambda backend: repository)
+    result = CliRunner().invoke(commands.dfes, ["show", "--at", "2023-12-01 08:00:00"], catch_exceptions=False)
+
+    assert "No bans found in feeds stored before" in result.output
+    assert "Feed repository is empty" not in result.output